@@ -0,0 +1,6 @@
+"""Замеры производительности горячих страниц Yatube.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks --size 10k --output bench.json
+"""
@@ -0,0 +1,57 @@
+import argparse
+import sys
+
+from benchmarks.environment import (create_database, meta, setup_django,
+                                    write_report)
+
+
+def parse_args():
+    from benchmarks.datasets import SIZES
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Замеры задержки страниц Yatube на синтетических данных.')
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Замеряемых запросов на страницу.')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='Запросов на прогрев перед замером.')
+    parser.add_argument('--views', nargs='+',
+                        help='Только эти страницы (по умолчанию все).')
+    parser.add_argument('--database',
+                        help='Файл SQLite для данных; без него БД в памяти.')
+    parser.add_argument('--keepdb', action='store_true',
+                        help='Не пересоздавать --database между запусками.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-',
+                        help='Файл для JSON с результатами или - для stdout.')
+    return parser.parse_args()
+
+
+def main():
+    setup_django()
+
+    from benchmarks import datasets
+    from benchmarks.runner import Scenario
+
+    args = parse_args()
+    create_database(args.database, args.keepdb)
+    if not datasets.is_loaded(args.size):
+        print(f'Загрузка данных {args.size}...', file=sys.stderr)
+        datasets.load(args.size, seed=args.seed)
+
+    scenario = Scenario(seed=args.seed)
+    results = {}
+    for view in args.views or Scenario.views:
+        print(f'Замер {view}...', file=sys.stderr)
+        results[view] = scenario.run(view, args.requests, args.warmup)
+
+    write_report({
+        'meta': meta(size=args.size, dataset=datasets.SIZES[args.size],
+                     requests=args.requests),
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
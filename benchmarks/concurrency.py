@@ -0,0 +1,160 @@
+"""Параллельные чтения и записи в SQLite: журнал отката против WAL.
+
+    python -m benchmarks.concurrency --readers 4 --writers 2 --seconds 5
+
+Процессы-читатели открывают ленту, профиль и пост, процессы-писатели
+публикуют посты через форму. БД — файл во временном каталоге, одна на все
+профили. Для каждого профиля PRAGMA в отчёте — чтений и записей в секунду,
+задержки и число ошибок «database is locked». Работает только там, где
+есть fork.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.environment import (create_database, meta, setup_django,
+                                    write_report)
+
+# журнал отката — поведение SQLite до настройки SQLITE_PRAGMAS
+PROFILES = {
+    'rollback': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'wal': None,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.concurrency',
+        description='Чтения и записи в SQLite из нескольких процессов.')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES,
+                        default=list(PROFILES))
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--output', default='-',
+                        help='Файл для JSON с результатами или - для stdout.')
+    return parser.parse_args()
+
+
+def read(client, urls, number):
+    return client.get(urls[number % len(urls)])
+
+
+def write(client, urls, number):
+    from django.urls import reverse
+
+    return client.post(reverse('posts:post_create'), {
+        'text': f'Пост под нагрузкой {os.getpid()}-{number}', 'group': ''})
+
+
+def work(role, user_id, urls, deadline, results):
+    from django.db import connections
+    from django.test import Client
+
+    from posts.models import User
+
+    # соединение родителя нельзя делить с потомком
+    connections.close_all()
+    client = Client()
+    client.force_login(User.objects.get(pk=user_id))
+    call = read if role == 'read' else write
+    timings, errors, number = [], 0, 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            response = call(client, urls, number)
+            failed = response.status_code >= 400
+        except Exception:
+            failed = True
+        if failed:
+            errors += 1
+        else:
+            timings.append(time.perf_counter() - started)
+        number += 1
+    connections.close_all()
+    results.put((role, timings, errors))
+
+
+def summarize(timings, errors, seconds):
+    from benchmarks.runner import percentile
+
+    if not timings:
+        return {'requests': 0, 'errors': errors}
+    return {
+        'requests': len(timings),
+        'per_second': round(len(timings) / seconds, 1),
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'errors': errors,
+    }
+
+
+def measure(args, urls, user_ids):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    deadline = time.time() + args.seconds
+    roles = ['read'] * args.readers + ['write'] * args.writers
+    processes = [
+        context.Process(target=work, args=(
+            role, user_ids[number % len(user_ids)], urls, deadline, results))
+        for number, role in enumerate(roles)
+    ]
+    for process in processes:
+        process.start()
+    collected = {'read': ([], 0), 'write': ([], 0)}
+    for _ in processes:
+        role, timings, errors = results.get()
+        total, failed = collected[role]
+        collected[role] = (total + timings, failed + errors)
+    for process in processes:
+        process.join()
+    return {
+        f'{role}s': summarize(timings, errors, args.seconds)
+        for role, (timings, errors) in collected.items()
+    }
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from benchmarks import datasets
+    from benchmarks.sessions import page_urls
+    from posts.models import User
+
+    args = parse_args()
+    directory = tempfile.mkdtemp(prefix='yatube-concurrency-')
+    create_database(os.path.join(directory, 'db.sqlite3'))
+    print('Загрузка данных tiny...', file=sys.stderr)
+    datasets.load('tiny')
+    urls, _ = page_urls()
+    user_ids = list(User.objects.order_by('id').values_list(
+        'id', flat=True))
+    configured = dict(settings.SQLITE_PRAGMAS)
+
+    results = {}
+    for name in args.profiles:
+        print(f'Замер {name}...', file=sys.stderr)
+        pragmas = PROFILES[name] or configured
+        settings.SQLITE_PRAGMAS = pragmas
+        # режим журнала хранится в файле БД: переключаем его заранее
+        connection.close()
+        connection.ensure_connection()
+        connection.close()
+        results[name] = {'pragmas': pragmas,
+                         **measure(args, urls, user_ids)}
+
+    write_report({
+        'meta': meta(readers=args.readers, writers=args.writers,
+                     seconds=args.seconds, cpu_count=os.cpu_count()),
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
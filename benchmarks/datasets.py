@@ -0,0 +1,78 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from posts import counters, stats
+from posts.models import Group, Post
+from posts.transfer import keep_post_dates
+
+User = get_user_model()
+
+SIZES = {
+    'tiny': {'posts': 500, 'groups': 10, 'authors': 50},
+    '10k': {'posts': 10_000, 'groups': 100, 'authors': 1_000},
+    '1m': {'posts': 1_000_000, 'groups': 10_000, 'authors': 50_000},
+}
+BATCH_SIZE = 5_000
+ZIPF_EXPONENT = 1.1
+PASSWORD = 'benchmark-password'
+
+
+def zipf_cum_weights(count, exponent=ZIPF_EXPONENT):
+    """Накопленные веса: k-й автор пишет в k^s раз реже первого."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def is_loaded(size):
+    # замеры добавляют посты, поэтому сверяем только авторов и группы
+    spec = SIZES[size]
+    return (User.objects.count() == spec['authors']
+            and Group.objects.count() == spec['groups'])
+
+
+def load(size, seed=0):
+    """Заполняет пустую БД синтетическими данными заданного размера."""
+    spec = SIZES[size]
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(username=f'author{i}', first_name=f'Автор {i}',
+                  password=password)
+             for i in range(spec['authors'])])
+        Group.objects.bulk_create(
+            [Group(title=f'Группа {i}', slug=f'group-{i}',
+                   description=f'Описание группы {i}')
+             for i in range(spec['groups'])])
+    author_ids = list(User.objects.order_by('id').values_list(
+        'id', flat=True))
+    group_ids = list(Group.objects.order_by('id').values_list(
+        'id', flat=True))
+    cum_weights = zipf_cum_weights(len(author_ids))
+    pub_date = timezone.now() - timedelta(minutes=spec['posts'])
+    with keep_post_dates():
+        for start in range(0, spec['posts'], BATCH_SIZE):
+            count = min(BATCH_SIZE, spec['posts'] - start)
+            authors = rng.choices(author_ids, cum_weights=cum_weights,
+                                  k=count)
+            posts = []
+            for author_id in authors:
+                pub_date += timedelta(seconds=rng.randint(1, 120))
+                posts.append(Post(
+                    text=f'Синтетический пост {start + len(posts)}',
+                    author_id=author_id,
+                    group_id=(rng.choice(group_ids)
+                              if rng.random() < 0.7 else None),
+                    pub_date=pub_date,
+                    updated_at=pub_date,
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+    counters.reconcile()
+    stats.rebuild()
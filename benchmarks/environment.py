@@ -0,0 +1,61 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'yatube')
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    import django
+    django.setup()
+
+
+def create_database(path=None, keepdb=False):
+    """Создаёт отдельную тестовую БД; рабочая БД проекта не трогается."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    if path:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = path
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meta(**extra):
+    import django
+    from django.db import connection
+
+    return {
+        **extra,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'created': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_report(report, output):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output == '-':
+        print(text)
+        return
+    with open(output, 'w', encoding='utf-8') as stream:
+        stream.write(text + '\n')
@@ -0,0 +1,92 @@
+"""Скорость входа по паролю для профилей хэширования.
+
+    python -m benchmarks.logins --seconds 3 --output logins.json
+
+Вход замеряется в одном процессе, поэтому результат — входов в секунду
+на одно ядро. Профили, для которых не установлена библиотека, попадают
+в отчёт с полем error.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.environment import (create_database, meta, setup_django,
+                                    write_report)
+
+PASSWORD = 'benchmark-password'
+
+
+def parse_args(profiles):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.logins',
+        description='Входов в секунду на ядро для профилей паролей.')
+    parser.add_argument('--profiles', nargs='+', choices=profiles,
+                        default=profiles)
+    parser.add_argument('--seconds', type=float, default=3.0,
+                        help='Длительность замера одного профиля.')
+    parser.add_argument('--output', default='-',
+                        help='Файл для JSON с результатами или - для stdout.')
+    return parser.parse_args()
+
+
+def measure(user, seconds):
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    url = reverse('users:login')
+    data = {'username': user.username, 'password': PASSWORD}
+    # первый вход пересчитывает хэш под параметры профиля
+    client.post(url, data)
+    logins = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        response = client.post(url, data)
+        if response.status_code != 302:
+            raise RuntimeError(f'вход не удался: {response.status_code}')
+        logins += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'logins': logins,
+        'logins_per_second': round(logins / elapsed, 1),
+        'ms_per_login': round(elapsed / logins * 1000, 2),
+    }
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import get_hasher
+    from django.test import override_settings
+
+    args = parse_args(list(settings.PASSWORD_HASHER_PROFILES))
+    create_database()
+    user = get_user_model().objects.create_user(
+        'benchmark', password=PASSWORD)
+
+    results = {}
+    for profile in args.profiles:
+        hashers = settings.PASSWORD_HASHER_PROFILES[profile]
+        print(f'Замер {profile}...', file=sys.stderr)
+        with override_settings(PASSWORD_HASHERS=hashers):
+            hasher = get_hasher()
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError as error:
+                results[profile] = {'hasher': hashers[0], 'error': str(error)}
+                continue
+            results[profile] = {
+                'hasher': hashers[0], **measure(user, args.seconds)}
+
+    write_report({
+        'meta': meta(seconds=args.seconds, cpu_count=os.cpu_count()),
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import math
+import random
+import time
+
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+
+from core import cache
+from core.query_budget import QueryStats
+from posts.models import Group, Post, User
+
+from .datasets import zipf_cum_weights
+
+
+def percentile(values, share):
+    """Процентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings, queries):
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+class Scenario:
+    """Набор запросов к страницам со случайными, но воспроизводимыми целями."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.usernames = list(User.objects.order_by('id').values_list(
+            'username', flat=True))
+        self.author_weights = zipf_cum_weights(len(self.usernames))
+        self.slugs = list(Group.objects.values_list('slug', flat=True))
+        # посты загружаются пачками подряд, поэтому id идут без пропусков
+        self.post_id_range = Post.objects.aggregate(
+            first=Min('id'), last=Max('id'))
+        self.writer = User.objects.order_by('id').first()
+        self.own_post_ids = list(Post.objects.filter(
+            author=self.writer).values_list('id', flat=True)[:1000])
+        self.anonymous = Client()
+        self.authorized = Client()
+        self.authorized.force_login(self.writer)
+
+    def index(self):
+        page = self.rng.randint(1, 50)
+        return self.anonymous.get(reverse('posts:index'), {'page': page})
+
+    def group_posts(self):
+        slug = self.rng.choice(self.slugs)
+        return self.anonymous.get(
+            reverse('posts:group_list', kwargs={'slug': slug}))
+
+    def profile(self):
+        username, = self.rng.choices(
+            self.usernames, cum_weights=self.author_weights)
+        return self.anonymous.get(
+            reverse('posts:profile', kwargs={'username': username}))
+
+    def post_detail(self):
+        post_id = self.rng.randint(self.post_id_range['first'],
+                                   self.post_id_range['last'])
+        return self.anonymous.get(
+            reverse('posts:post_detail', kwargs={'post_id': post_id}))
+
+    def post_create(self):
+        return self.authorized.post(reverse('posts:post_create'), {
+            'text': f'Новый пост {self.rng.random()}',
+            'group': '',
+        })
+
+    def post_edit(self):
+        post_id = self.rng.choice(self.own_post_ids)
+        return self.authorized.post(
+            reverse('posts:post_edit', kwargs={'post_id': post_id}),
+            {'text': f'Правка {self.rng.random()}', 'group': ''},
+        )
+
+    views = ('index', 'group_posts', 'profile', 'post_detail',
+             'post_create', 'post_edit')
+
+    def run(self, view, requests, warmup):
+        call = getattr(self, view)
+        for _ in range(warmup):
+            call()
+        cache.reset_stats()
+        timings = []
+        queries = []
+        for _ in range(requests):
+            stats = QueryStats()
+            with connection.execute_wrapper(stats):
+                started = time.perf_counter()
+                response = call()
+                timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'{view}: ответ {response.status_code}')
+            queries.append(stats.count)
+        result = summarize(timings, queries)
+        result['cache'] = {
+            alias: values for alias, values in cache.stats().items()
+            if any(values.values())
+        }
+        return result
@@ -0,0 +1,125 @@
+"""Запросы к БД на страницу для разных хранилищ сессий.
+
+    python -m benchmarks.sessions --size tiny --requests 200
+
+Авторизованный клиент обходит ленту, группу, профиль, пост и ленту
+подписок. Для каждого SESSION_ENGINE в отчёте — запросы на страницу,
+из них к таблице сессий, и сколько запросов сэкономлено против db.
+"""
+import argparse
+import itertools
+import sys
+import time
+
+from benchmarks.environment import (create_database, meta, setup_django,
+                                    write_report)
+
+
+class SessionQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.session_count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if 'django_session' in sql:
+            self.session_count += 1
+        return execute(sql, params, many, context)
+
+
+def parse_args(engines, sizes):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.sessions',
+        description='Запросы к БД на страницу для хранилищ сессий.')
+    parser.add_argument('--engines', nargs='+', choices=engines,
+                        default=list(engines))
+    parser.add_argument('--size', choices=sizes, default='tiny')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--output', default='-',
+                        help='Файл для JSON с результатами или - для stdout.')
+    return parser.parse_args()
+
+
+def page_urls():
+    from django.urls import reverse
+
+    from posts.models import Group, Post, User
+
+    author = User.objects.order_by('id').first()
+    group = Group.objects.order_by('id').first()
+    post = Post.objects.order_by('id').first()
+    return [
+        reverse('posts:index'),
+        reverse('posts:group_list', kwargs={'slug': group.slug}),
+        reverse('posts:profile', kwargs={'username': author.username}),
+        reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        reverse('posts:follow_index'),
+    ], author
+
+
+def measure(urls, user, requests, warmup):
+    from django.db import connection
+    from django.test import Client
+
+    from benchmarks.runner import summarize
+    from core.cache import clear_all
+
+    # сессии и страницы лежат в разных псевдонимах кэша
+    clear_all()
+    client = Client()
+    client.force_login(user)
+    pages = itertools.cycle(urls)
+    for _ in range(warmup):
+        client.get(next(pages))
+    timings, queries, session_queries = [], [], []
+    for _ in range(requests):
+        stats = SessionQueryStats()
+        with connection.execute_wrapper(stats):
+            started = time.perf_counter()
+            response = client.get(next(pages))
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f'ответ {response.status_code}')
+        queries.append(stats.count)
+        session_queries.append(stats.session_count)
+    result = summarize(timings, queries)
+    result['session_queries_per_request'] = round(
+        sum(session_queries) / requests, 2)
+    return result
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.test import override_settings
+
+    from benchmarks import datasets
+
+    args = parse_args(settings.SESSION_ENGINES, datasets.SIZES)
+    create_database()
+    print(f'Загрузка данных {args.size}...', file=sys.stderr)
+    datasets.load(args.size)
+    urls, user = page_urls()
+
+    results = {}
+    for name in args.engines:
+        print(f'Замер {name}...', file=sys.stderr)
+        engine = settings.SESSION_ENGINES[name]
+        with override_settings(SESSION_ENGINE=engine):
+            results[name] = measure(urls, user, args.requests, args.warmup)
+    if 'db' in results:
+        baseline = results['db']['queries_per_request']
+        for result in results.values():
+            result['queries_saved_vs_db'] = round(
+                baseline - result['queries_per_request'], 2)
+
+    write_report({
+        'meta': meta(size=args.size, requests=args.requests),
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+from .tasks import Worker
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'key',
+        'state',
+        'attempts',
+        'run_at',
+    )
+    list_filter = ('state', 'name')
+    search_fields = ('key',)
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        # задачу, которую с тем же ключом уже поставили заново, requeue
+        # удаляет: её работу сделает ожидающая
+        worker = Worker(name='admin')
+        now = timezone.now()
+        failed = queryset.filter(state=Task.FAILED)
+        for pk in list(failed.values_list('id', flat=True)):
+            worker.requeue(pk, attempts=0, run_at=now)
+    retry.short_description = 'Повторить упавшие задачи'
+
+
+admin.site.register(Task, TaskAdmin)
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        # задачи регистрируются при импорте модулей tasks приложений
+        autodiscover_modules('tasks')
+        from . import checks  # noqa: F401
+        from . import db, mail  # noqa: F401 сигналы БД и задача почты
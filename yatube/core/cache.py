@@ -0,0 +1,352 @@
+"""Кэши по назначению и их статистика.
+
+Алиасы в settings.CACHES: pages — страницы и версии их тегов, fragments —
+карточки постов, counters — счётчики, sessions — сессии. Обращаться к ним
+удобно через одноимённые объекты модуля: posts использует pages.get(...).
+
+Оба бэкенда считают попадания, промахи, записи и вытеснения. У LocMemCache
+счётчики свои в каждом процессе, у MmapCache они лежат в общем файле
+вместе с данными, так что их видят все воркеры на машине.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+PAGES = 'pages'
+FRAGMENTS = 'fragments'
+COUNTERS = 'counters'
+SESSIONS = 'sessions'
+
+STATS = ('hits', 'misses', 'sets', 'evictions')
+
+_MISSING = object()
+
+
+class CacheAlias:
+    """Ссылка на caches[alias]: экземпляр бэкенда свой в каждом потоке."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __getattr__(self, name):
+        return getattr(caches[self.alias], name)
+
+
+pages = CacheAlias(PAGES)
+fragments = CacheAlias(FRAGMENTS)
+counters = CacheAlias(COUNTERS)
+sessions = CacheAlias(SESSIONS)
+
+
+def stats():
+    """Статистика алиасов, чьи бэкенды её ведут."""
+    return {
+        alias: caches[alias].stats() for alias in settings.CACHES
+        if hasattr(caches[alias], 'stats')
+    }
+
+
+def reset_stats():
+    for alias in stats():
+        caches[alias].reset_stats()
+
+
+def clear_all():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+_local_stats = {}
+_local_stats_lock = threading.Lock()
+
+
+class LocMemCache(BaseLocMemCache):
+    """Кэш в памяти процесса со статистикой."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._stats = _local_stats.setdefault(name, Counter())
+
+    def _record(self, name, count=1):
+        with _local_stats_lock:
+            self._stats[name] += count
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._record('misses')
+            return default
+        self._record('hits')
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, timeout, version=version)
+        self._record('sets')
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = super().add(key, value, timeout, version=version)
+        if added:
+            self._record('sets')
+        return added
+
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        self._record('evictions', before - len(self._cache))
+
+    def stats(self):
+        with _local_stats_lock:
+            return {name: self._stats[name] for name in STATS}
+
+    def reset_stats(self):
+        with _local_stats_lock:
+            self._stats.clear()
+
+
+# заголовок файла: метка, число слотов, размер слота и счётчики STATS
+HEADER = struct.Struct('=8sII4Q')
+STATS_OFFSET = struct.calcsize('=8sII')
+HEADER_SIZE = 64
+MAGIC = b'yatube1\0'
+# заголовок слота: md5 ключа, занят ли, срок жизни, длина данных
+SLOT = struct.Struct('=16s?dI')
+# столько соседних слотов просматривается при поиске ключа
+PROBES = 8
+
+
+class SharedFile:
+    """Файл кэша, отображённый в память одного процесса."""
+
+    def __init__(self, path, slots, slot_size):
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = HEADER_SIZE + slots * slot_size
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size == 0:
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, HEADER.pack(
+                    MAGIC, slots, slot_size, 0, 0, 0, 0), 0)
+            header = HEADER.unpack(os.pread(self.fd, HEADER.size, 0))
+            if header[:3] != (MAGIC, slots, slot_size):
+                raise ImproperlyConfigured(
+                    f'Файл кэша {path} создан с другими параметрами, '
+                    f'удалите его.')
+            self.map = mmap.mmap(self.fd, size)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self):
+        # flock разделяет процессы, а потоки одного процесса — self.lock
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield self.map
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+_shared_files = {}
+_shared_files_lock = threading.Lock()
+
+
+def _shared_file(path, slots, slot_size):
+    # после fork дескриптор нужно открыть заново: flock общего
+    # дескриптора не разделяет родителя и потомка
+    key = (path, slots, slot_size, os.getpid())
+    with _shared_files_lock:
+        if key not in _shared_files:
+            _shared_files[key] = SharedFile(path, slots, slot_size)
+        return _shared_files[key]
+
+
+class MmapCache(BaseCache):
+    """Кэш в файле, общий для процессов одной машины.
+
+    Файл — хеш-таблица из MAX_ENTRIES слотов по SLOT_SIZE байт. Ключ
+    ищется в PROBES соседних слотах; если свободных нет, вытесняется
+    запись с ближайшим сроком жизни. Значения крупнее слота не кэшируются.
+    Файл лучше держать в /dev/shm, тогда он целиком в памяти.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        if fcntl is None:
+            raise ImproperlyConfigured(
+                'MmapCache работает только в Unix-системах.')
+        options = params.get('OPTIONS', {})
+        self._location = location
+        self._slots = self._max_entries
+        self._slot_size = options.get('SLOT_SIZE', 4096)
+
+    @property
+    def _file(self):
+        return _shared_file(self._location, self._slots, self._slot_size)
+
+    def _digest(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return hashlib.md5(key.encode()).digest()
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * self._slot_size
+
+    def _find(self, data, digest, now):
+        """Слот ключа, свободный слот и кандидат на вытеснение."""
+        start = int.from_bytes(digest[:8], 'little') % self._slots
+        found = free = victim = None
+        victim_expires = None
+        for step in range(PROBES):
+            index = (start + step) % self._slots
+            slot_digest, used, expires, _ = SLOT.unpack_from(
+                data, self._offset(index))
+            live = used and expires > now
+            if slot_digest == digest and live:
+                found = index
+            elif not live:
+                if free is None:
+                    free = index
+            elif victim_expires is None or expires < victim_expires:
+                victim, victim_expires = index, expires
+        return found, free, victim
+
+    def _count(self, data, name, count=1):
+        offset = STATS_OFFSET + 8 * STATS.index(name)
+        value, = struct.unpack_from('=Q', data, offset)
+        struct.pack_into('=Q', data, offset, value + count)
+
+    def _read(self, data, index):
+        offset = self._offset(index)
+        *_, length = SLOT.unpack_from(data, offset)
+        start = offset + SLOT.size
+        return data[start:start + length]
+
+    def _write(self, data, index, digest, pickled, expires):
+        offset = self._offset(index)
+        SLOT.pack_into(data, offset, digest, True, expires, len(pickled))
+        data[offset + SLOT.size:offset + SLOT.size + len(pickled)] = pickled
+
+    def _store(self, data, digest, pickled, expires, now):
+        found, free, victim = self._find(data, digest, now)
+        if found is None and free is None:
+            self._count(data, 'evictions')
+        target = next(index for index in (found, free, victim)
+                      if index is not None)
+        self._write(data, target, digest, pickled, expires)
+        self._count(data, 'sets')
+
+    def _expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return float('inf') if expires is None else expires
+
+    def _fits(self, pickled):
+        return SLOT.size + len(pickled) <= self._slot_size
+
+    def get(self, key, default=None, version=None):
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            found, _, _ = self._find(data, digest, time.time())
+            if found is None:
+                self._count(data, 'misses')
+                return default
+            self._count(data, 'hits')
+            pickled = self._read(data, found)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        if not self._fits(pickled):
+            # старое значение не должно пережить новое
+            self.delete(key, version=version)
+            return
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            self._store(data, digest, pickled, self._expires(timeout),
+                        time.time())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        if not self._fits(pickled):
+            return False
+        digest = self._digest(key, version)
+        now = time.time()
+        with self._file.locked() as data:
+            if self._find(data, digest, now)[0] is not None:
+                return False
+            self._store(data, digest, pickled, self._expires(timeout), now)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            found, _, _ = self._find(data, digest, time.time())
+            if found is None:
+                return False
+            offset = self._offset(found)
+            *_, length = SLOT.unpack_from(data, offset)
+            SLOT.pack_into(data, offset, digest, True,
+                           self._expires(timeout), length)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        # чтение и запись под одной блокировкой, в отличие от BaseCache
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            found, _, _ = self._find(data, digest, time.time())
+            if found is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(self._read(data, found)) + delta
+            pickled = pickle.dumps(value, self.pickle_protocol)
+            _, _, expires, _ = SLOT.unpack_from(data, self._offset(found))
+            self._write(data, found, digest, pickled, expires)
+        return value
+
+    def has_key(self, key, version=None):
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            return self._find(data, digest, time.time())[0] is not None
+
+    def delete(self, key, version=None):
+        digest = self._digest(key, version)
+        with self._file.locked() as data:
+            found, _, _ = self._find(data, digest, time.time())
+            if found is not None:
+                SLOT.pack_into(data, self._offset(found), b'', False, 0, 0)
+
+    def clear(self):
+        with self._file.locked() as data:
+            for index in range(self._slots):
+                SLOT.pack_into(data, self._offset(index), b'', False, 0, 0)
+
+    def stats(self):
+        with self._file.locked() as data:
+            values = HEADER.unpack_from(data)[3:]
+        return dict(zip(STATS, values))
+
+    def reset_stats(self):
+        with self._file.locked() as data:
+            HEADER.pack_into(data, 0, MAGIC, self._slots, self._slot_size,
+                             0, 0, 0, 0)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+# движки, которые читают сессию из кэша
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register()
+def check_session_cache(app_configs, **kwargs):
+    if settings.SESSION_ENGINE not in CACHED_SESSION_ENGINES:
+        return []
+    if not isinstance(caches[settings.SESSION_CACHE_ALIAS],
+                      (LocMemCache, DummyCache)):
+        return []
+    # выход удаляет сессию только из кэша того процесса, что его обработал
+    return [Error(
+        f'Сессии {settings.SESSION_ENGINE} хранятся в кэше '
+        f'{settings.SESSION_CACHE_ALIAS!r}, у каждого процесса своём: '
+        f'после выхода другие воркеры продолжат принимать сессию',
+        hint='CACHE_PROFILE=shared или SESSION_PROFILE=db',
+        id='core.E001',
+    )]
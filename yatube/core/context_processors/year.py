@@ -1,7 +1,18 @@
-from django.utils.timezone import now
+import time
+from datetime import datetime
+
+from django.utils import timezone
+
+# год меняется раз в году, поэтому хранится до начала следующего
+_current = {'year': None, 'until': 0.0}
 
 
 def year(request):
+    if time.time() >= _current['until']:
+        now = timezone.now()
+        _current['year'] = now.year
+        _current['until'] = datetime(
+            now.year + 1, 1, 1, tzinfo=now.tzinfo).timestamp()
     return {
-        'year': now().year
+        'year': _current['year']
     }
@@ -0,0 +1,24 @@
+"""Настройка соединений с БД при открытии.
+
+SQLite переводится в режим WAL: читатели не ждут пишущую транзакцию,
+а она — читателей. Параметры берутся из settings.SQLITE_PRAGMAS и
+применяются к каждому новому соединению; при CONN_MAX_AGE соединение
+живёт между запросами, так что это происходит редко.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(raw_connection, pragmas):
+    for name, value in pragmas.items():
+        raw_connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    # напрямую через драйвер: эти запросы не должны попадать
+    # в счётчики запросов страницы
+    apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
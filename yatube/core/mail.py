@@ -0,0 +1,126 @@
+"""Почта через очередь задач.
+
+QueuedEmailBackend только сохраняет собранные письма в OutgoingMail,
+поэтому запрос не ждёт почтовый сервер. Задача send_queued_mail
+отправляет их пачками через EMAIL_DELIVERY_BACKEND, открывая одно
+соединение на пачку. Письмо, которое отверг сервер, не мешает остальным:
+у него растёт счётчик попыток, а после EMAIL_MAX_ATTEMPTS оно остаётся
+в таблице с последней ошибкой и больше не отправляется.
+"""
+import email
+import logging
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutgoingMail
+from .tasks import task
+
+SEND_KEY = 'mail:send'
+
+# сервер ответил отказом на само письмо, соединение остаётся рабочим
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused,
+                  smtplib.SMTPResponseException)
+
+logger = logging.getLogger(__name__)
+
+
+class StoredMIME(MIMEMixin, email.message.Message):
+    """Разобранное письмо из очереди, сериализуется как MIME Django."""
+
+
+class QueuedMessage(EmailMessage):
+    """Письмо, собранное при постановке в очередь.
+
+    Заголовки и тело берутся из сохранённого MIME как есть, а recipients
+    содержит всех получателей конверта, включая скрытые копии.
+    """
+
+    def __init__(self, raw, from_email, recipients):
+        super().__init__(from_email=from_email, to=recipients)
+        self.raw = raw
+
+    def message(self):
+        return email.message_from_bytes(self.raw, _class=StoredMIME)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        rows = [
+            OutgoingMail(
+                from_email=message.from_email,
+                recipients='\n'.join(message.recipients()),
+                message=message.message().as_bytes(linesep='\n'),
+            )
+            for message in email_messages if message.recipients()
+        ]
+        if rows:
+            OutgoingMail.objects.bulk_create(rows)
+            send_queued_mail.enqueue(key=SEND_KEY)
+        return len(rows)
+
+
+def claim_batch(size):
+    """Закрепляет за вызовом до size писем, не взятых другим воркером."""
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    free = Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(
+        seconds=settings.TASKS_LEASE_TIMEOUT))
+    # отвергнутые письма пропускают вперёд новые
+    candidates = list(OutgoingMail.objects.filter(
+        free, attempts__lt=settings.EMAIL_MAX_ATTEMPTS,
+    ).order_by('attempts', 'id').values_list('id', flat=True)[:size])
+    OutgoingMail.objects.filter(free, pk__in=candidates).update(
+        claimed_by=token, claimed_at=now)
+    return list(OutgoingMail.objects.filter(claimed_by=token).order_by('id'))
+
+
+@task(name='core.mail.send_queued_mail', max_attempts=5, retry_delay=30)
+def send_queued_mail():
+    batch = claim_batch(settings.EMAIL_BATCH_SIZE)
+    if not batch:
+        return
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    sent, rejected = [], []
+    try:
+        with connection:
+            for mail in batch:
+                try:
+                    connection.send_messages([QueuedMessage(
+                        bytes(mail.message), mail.from_email,
+                        mail.recipients.split('\n'),
+                    )])
+                except MESSAGE_ERRORS as error:
+                    if reject(mail, error):
+                        rejected.append(mail.pk)
+                else:
+                    sent.append(mail.pk)
+    finally:
+        OutgoingMail.objects.filter(pk__in=sent).delete()
+        # неотправленные письма сразу доступны повтору задачи
+        OutgoingMail.objects.filter(
+            pk__in=[mail.pk for mail in batch],
+        ).exclude(pk__in=sent).update(claimed_by='', claimed_at=None)
+    if len(batch) == settings.EMAIL_BATCH_SIZE:
+        send_queued_mail.enqueue(key=SEND_KEY)
+    elif rejected:
+        send_queued_mail.enqueue(
+            key=SEND_KEY, delay=send_queued_mail.retry_delay)
+
+
+def reject(mail, error):
+    """Записывает отказ сервера; False, если попыток больше не будет."""
+    OutgoingMail.objects.filter(pk=mail.pk).update(
+        attempts=F('attempts') + 1, last_error=repr(error))
+    if mail.attempts + 1 < settings.EMAIL_MAX_ATTEMPTS:
+        return True
+    logger.error('Письмо #%s не отправлено после %s попыток: %r',
+                 mail.pk, mail.attempts + 1, error)
+    return False
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core import cache
+
+
+class Command(BaseCommand):
+    help = ('Показывает попадания, промахи, записи и вытеснения по алиасам '
+            'кэша. Для общего кэша счётчики суммарные по всем воркерам, '
+            'для локального — только этого процесса.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.')
+
+    def handle(self, *args, **options):
+        for alias, values in cache.stats().items():
+            reads = values['hits'] + values['misses']
+            ratio = values['hits'] / reads if reads else 0
+            self.stdout.write(
+                f'{alias}: попаданий {values["hits"]} ({ratio:.1%}), '
+                f'промахов {values["misses"]}, '
+                f'записей {values["sets"]}, '
+                f'вытеснений {values["evictions"]}')
+        if options['reset']:
+            cache.reset_stats()
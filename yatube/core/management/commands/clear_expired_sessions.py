@@ -0,0 +1,35 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии пачками. В отличие от clearsessions '
+            'не держит одну долгую транзакцию на большой таблице.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько сессий удалять одним запросом.')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # кэш и подписанные куки истекают сами
+            store.clear_expired()
+            self.stdout.write('Сессии хранятся не в БД, удалять нечего')
+            return
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list(
+                'session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            model.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших сессий: {deleted}'))
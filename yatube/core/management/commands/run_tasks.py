@@ -0,0 +1,66 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import Worker
+
+
+def work(poll_interval, burst):
+    import django
+    django.setup()
+    worker = Worker(poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    try:
+        if burst:
+            worker.run_pending()
+        else:
+            worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул процессов, выполняющих фоновые задачи.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Число процессов-воркеров.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выполнить накопившиеся задачи и выйти.')
+
+    def handle(self, *args, **options):
+        arguments = (options['poll_interval'], options['burst'])
+        if options['processes'] == 1:
+            work(*arguments)
+            return
+        # соединения родителя не должны достаться дочерним процессам
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=arguments)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop_workers(*args):
+            # воркеры доделают текущую задачу и выйдут
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, stop_workers)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+                process.join()
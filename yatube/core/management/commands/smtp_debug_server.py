@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.smtp import DebuggingSMTPServer
+
+
+class Command(BaseCommand):
+    help = ('Локальный SMTP-сервер, печатающий письма. Для разработки: '
+            'EMAIL_DELIVERY_BACKEND smtp, EMAIL_HOST localhost, '
+            'EMAIL_PORT как у сервера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+
+    def handle(self, *args, **options):
+        server = DebuggingSMTPServer(
+            options['host'], options['port'], on_message=self.print_message)
+        self.stdout.write(f'SMTP на {options["host"]}:{server.port}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def print_message(self, envelope):
+        self.stdout.write(self.style.SUCCESS(
+            f'{envelope.mail_from} → {", ".join(envelope.rcpt_to)}'))
+        self.stdout.write(envelope.data.decode('utf-8', 'replace'))
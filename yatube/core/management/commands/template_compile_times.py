@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templating import compile_times
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время разбора каждого шаблона проекта, медленные '
+            'сверху. С --max-ms завершается ошибкой, если есть шаблоны '
+            'медленнее порога.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Сколько раз разбирать шаблон.')
+        parser.add_argument('--max-ms', type=float,
+                            help='Допустимое время разбора в мс.')
+
+    def handle(self, *args, **options):
+        times = compile_times(options['repeat'])
+        slow = []
+        for name, seconds in sorted(
+                times.items(), key=lambda item: item[1], reverse=True):
+            milliseconds = seconds * 1000
+            self.stdout.write(f'{milliseconds:8.3f} мс  {name}')
+            if options['max_ms'] is not None and (
+                    milliseconds > options['max_ms']):
+                slow.append(name)
+        self.stdout.write(
+            f'Всего: {sum(times.values()) * 1000:.3f} мс, '
+            f'шаблонов: {len(times)}')
+        if slow:
+            raise CommandError(
+                f'Дольше {options["max_ms"]} мс: {", ".join(slow)}')
@@ -0,0 +1,99 @@
+from django.db import models
+
+
+class Task(models.Model):
+    """Отложенный вызов функции, зарегистрированной через core.tasks.task."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=200,
+    )
+    payload = models.TextField(
+        default='{}',
+    )
+    key = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+    )
+    state = models.CharField(
+        max_length=10,
+        choices=STATES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+    )
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+    )
+    locked_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+    last_error = models.TextField(
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        # ключ склеивает повторные постановки, пока задача ждёт запуска
+        constraints = (
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(state='pending'),
+                name='task_pending_key_unique',
+            ),
+        )
+        indexes = (
+            models.Index(fields=('state', 'run_at'),
+                         name='task_state_run_at_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.state})'
+
+
+class OutgoingMail(models.Model):
+    """Собранное письмо, ждущее отправки воркером."""
+    from_email = models.CharField(
+        max_length=254,
+    )
+    recipients = models.TextField()
+    message = models.BinaryField()
+    claimed_by = models.CharField(
+        max_length=32,
+        blank=True,
+    )
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+    # сколько раз сервер отверг письмо; после EMAIL_MAX_ATTEMPTS оно
+    # остаётся в таблице для разбора, но больше не отправляется
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+    last_error = models.TextField(
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    def __str__(self):
+        return f'{self.from_email} → {self.recipients}'
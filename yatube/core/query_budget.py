@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(max_queries):
+    """Объявляет, сколько SQL-запросов может сделать представление."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class QueryStats:
+    """Обёртка для connection.execute_wrapper: считает запросы и время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к БД за время обработки запроса.
+
+    При DEBUG отдаёт статистику в заголовках X-DB-Queries, X-DB-Time-Ms
+    и X-DB-Query-Budget; превышение бюджета пишется в лог всегда.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                'Бюджет запросов превышен: %s сделал %d из %d',
+                request.path, stats.count, budget)
+        if settings.DEBUG:
+            response['X-DB-Queries'] = str(stats.count)
+            response['X-DB-Time-Ms'] = f'{stats.duration * 1000:.2f}'
+            if budget is not None:
+                response['X-DB-Query-Budget'] = str(budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, 'query_budget', None)
@@ -0,0 +1,91 @@
+"""Минимальный SMTP-сервер для разработки и тестов.
+
+Принимает письма без авторизации и TLS и складывает их в messages.
+Адреса из rejected отвергаются, как несуществующие ящики.
+Замена модулю smtpd, которого нет в новых версиях Python.
+"""
+import socketserver
+import threading
+from collections import namedtuple
+
+Envelope = namedtuple('Envelope', 'mail_from rcpt_to data')
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 yatube debugging SMTP')
+        mail_from, rcpt_to = None, []
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 yatube')
+            elif verb == 'MAIL':
+                mail_from, rcpt_to = command.split(':', 1)[1].strip(), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip()
+                if address.strip('<>') in self.server.rejected:
+                    self.reply('550 No such user')
+                    continue
+                rcpt_to.append(address)
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.server.deliver(
+                    Envelope(mail_from, rcpt_to, self.read_data()))
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        for raw in self.rfile:
+            if raw in (b'.\r\n', b'.\n'):
+                break
+            # точка в начале строки удваивается клиентом
+            lines.append(raw[1:] if raw.startswith(b'..') else raw)
+        return b''.join(lines)
+
+
+class DebuggingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, on_message=None,
+                 rejected=()):
+        super().__init__((host, port), SMTPHandler)
+        self.rejected = set(rejected)
+        self.messages = []
+        self.connections = 0
+        self.on_message = on_message
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def deliver(self, envelope):
+        with self._lock:
+            self.messages.append(envelope)
+        if self.on_message is not None:
+            self.on_message(envelope)
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
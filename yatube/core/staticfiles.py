@@ -0,0 +1,209 @@
+"""Сборка статики с хэшами в именах и её раздача.
+
+collectstatic с CompressedManifestStorage (STATIC_PROFILE=production)
+кладёт в STATIC_ROOT файлы с хэшем содержимого в имени, их сжатые
+копии .gz и .br и манифест staticfiles.json. {% static %} берёт имена
+из манифеста, прочитанного в память при запуске.
+
+StaticFilesApplication раздаёт собранные файлы прямо из WSGI, не доходя
+до Django: файлы с хэшем в имени кэшируются браузером навсегда, а сжатая
+копия выбирается по Accept-Encoding.
+"""
+import gzip
+import mimetypes
+import os
+from email.utils import formatdate
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # без brotli собираются только .gz
+    brotli = None
+
+# остальное — картинки и шрифты, они уже сжаты
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.json', '.txt', '.map')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# имена без хэша могут указывать на другое содержимое после сборки
+SHORT = 'public, max-age=60'
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Манифест, хэши в именах и сжатые копии каждого текстового файла."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._urls = {}
+
+    def compressors(self):
+        yield '.gz', _gzip
+        if brotli is not None:
+            yield '.br', _brotli
+
+    def post_process(self, paths, dry_run=False, **options):
+        # CSS переписывается за несколько проходов: сжимаем итоговые имена
+        final = {}
+        processed = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, result in processed:
+            yield name, hashed_name, result
+            if isinstance(result, Exception):
+                return
+            if hashed_name and name.lower().endswith(COMPRESSIBLE):
+                final[name] = hashed_name
+        if dry_run:
+            return
+        for name, hashed_name in final.items():
+            self.compress(name)
+            self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        for suffix, compress in self.compressors():
+            compressed = compress(content)
+            # копия не меньше оригинала никому не нужна
+            if len(compressed) < len(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+    def url(self, name, force=False):
+        # манифест не меняется до перезапуска: запоминаем готовые адреса
+        if settings.DEBUG or force:
+            return super().url(name, force)
+        if name not in self._urls:
+            self._urls[name] = super().url(name)
+        return self._urls[name]
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        quality = 1.0
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, cache_control):
+        self.cache_control = cache_control
+        self.content_type = (mimetypes.guess_type(path)[0]
+                             or 'application/octet-stream')
+        mtime = os.path.getmtime(path)
+        self.last_modified = formatdate(mtime, usegmt=True)
+        # кодировка -> (путь, размер, ETag); None — несжатый файл
+        self.variants = {}
+        for encoding, suffix in ((None, ''),) + ENCODINGS:
+            if os.path.exists(path + suffix):
+                size = os.path.getsize(path + suffix)
+                etag = f'"{size:x}-{int(mtime):x}"'
+                self.variants[encoding] = (path + suffix, size, etag)
+
+    def variant(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                return encoding, self.variants[encoding]
+        return None, self.variants[None]
+
+
+def collect_files(root, prefix, immutable):
+    """Адрес -> StaticFile для всех файлов в root, кроме сжатых копий."""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for file_name in names:
+            if file_name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                continue
+            path = os.path.join(directory, file_name)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            cache_control = IMMUTABLE if name in immutable else SHORT
+            files[prefix + name] = StaticFile(path, cache_control)
+    return files
+
+
+def hashed_names(root):
+    storage = ManifestStaticFilesStorage(location=root)
+    return set(storage.load_manifest().values())
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка, которая раздаёт собранную статику из STATIC_ROOT.
+
+    Список файлов составляется один раз при создании; остальные запросы
+    и файлы, собранные позже, уходят в обёрнутое приложение.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        root = root or settings.STATIC_ROOT
+        prefix = prefix or settings.STATIC_URL
+        self.files = {}
+        if root and os.path.isdir(root):
+            self.files = collect_files(root, prefix, hashed_names(root))
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        return self.serve(static_file, environ, start_response)
+
+    def serve(self, static_file, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed',
+                           [('Allow', 'GET, HEAD'),
+                            ('Content-Length', '0')])
+            return []
+        encoding, (path, size, etag) = static_file.variant(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        headers = [
+            ('Cache-Control', static_file.cache_control),
+            ('ETag', etag),
+            ('Last-Modified', static_file.last_modified),
+        ]
+        if len(static_file.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', headers)
+            return []
+        headers += [
+            ('Content-Type', static_file.content_type),
+            ('Content-Length', str(size)),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file)
+        return _chunks(file)
+
+
+def _chunks(file, size=64 * 1024):
+    with file:
+        for chunk in iter(lambda: file.read(size), b''):
+            yield chunk
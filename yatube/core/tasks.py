@@ -0,0 +1,167 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача — функция с JSON-сериализуемыми именованными аргументами,
+обёрнутая декоратором task. Вызов .enqueue() добавляет строку в core.Task
+в текущей транзакции, так что задача видна воркеру только после коммита.
+Выполняет задачи команда run_tasks. После сбоя или истёкшей аренды
+задача может выполниться повторно, поэтому она должна быть идемпотентной.
+"""
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts, retry_delay):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, key=None, delay=0, **kwargs):
+        """Ставит вызов в очередь.
+
+        Пока задача с тем же key ждёт запуска, повторная постановка
+        ничего не делает. При TASKS_EAGER задача выполняется сразу.
+        """
+        payload = json.dumps(kwargs, ensure_ascii=False)
+        if settings.TASKS_EAGER:
+            self.func(**json.loads(payload))
+            return
+        # INSERT с игнорированием конфликта не требует точки сохранения
+        Task.objects.bulk_create([Task(
+            name=self.name,
+            payload=payload,
+            key=key,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now() + timedelta(seconds=delay),
+        )], ignore_conflicts=True)
+
+
+def task(name=None, max_attempts=3, retry_delay=10):
+    """Регистрирует функцию как фоновую задачу.
+
+    retry_delay — пауза в секундах перед первым повтором, дальше
+    она удваивается с каждой попыткой.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = TaskFunction(
+            func, task_name, max_attempts, retry_delay)
+        return registry[task_name]
+    return decorator
+
+
+class Worker:
+    """Забирает и выполняет задачи по одной.
+
+    Захват — условный UPDATE pending → running, поэтому несколько
+    процессов не выполнят одну задачу дважды ни на SQLite, ни на
+    PostgreSQL. Задачи, зависшие в running дольше TASKS_LEASE_TIMEOUT,
+    возвращаются в очередь.
+    """
+
+    claim_batch = 10
+
+    def __init__(self, name=None, poll_interval=1.0):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.stopped = False
+
+    def claim(self):
+        now = timezone.now()
+        candidates = Task.objects.filter(
+            state=Task.PENDING, run_at__lte=now,
+        ).order_by('run_at', 'id').values_list('id', flat=True)
+        for pk in candidates[:self.claim_batch]:
+            claimed = Task.objects.filter(pk=pk, state=Task.PENDING).update(
+                state=Task.RUNNING,
+                locked_by=self.name,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Task.objects.get(pk=pk)
+        return None
+
+    def execute(self, job):
+        func = registry.get(job.name)
+        try:
+            if func is None:
+                raise LookupError(f'Неизвестная задача {job.name}')
+            func(**json.loads(job.payload))
+        except Exception:
+            self.retry_or_fail(job, func, traceback.format_exc())
+        else:
+            Task.objects.filter(pk=job.pk).delete()
+
+    def retry_or_fail(self, job, func, error):
+        if job.attempts >= job.max_attempts:
+            logger.error('Задача %s #%s не выполнена: %s',
+                         job.name, job.pk, error)
+            Task.objects.filter(pk=job.pk).update(
+                state=Task.FAILED, last_error=error)
+            return
+        retry_delay = func.retry_delay if func else 10
+        delay = retry_delay * 2 ** (job.attempts - 1)
+        self.requeue(job.pk, last_error=error,
+                     run_at=timezone.now() + timedelta(seconds=delay))
+
+    def requeue(self, pk, **fields):
+        try:
+            with transaction.atomic():
+                Task.objects.filter(pk=pk).update(
+                    state=Task.PENDING, locked_by='', locked_at=None,
+                    **fields)
+        except IntegrityError:
+            # пока задача выполнялась, такую же поставили заново
+            Task.objects.filter(pk=pk).delete()
+
+    def release_stale(self):
+        expired = timezone.now() - timedelta(
+            seconds=settings.TASKS_LEASE_TIMEOUT)
+        stale = Task.objects.filter(
+            state=Task.RUNNING, locked_at__lt=expired,
+        ).values_list('id', flat=True)
+        for pk in list(stale):
+            self.requeue(pk)
+
+    def run_pending(self):
+        """Выполняет задачи, пока очередь не опустеет."""
+        done = 0
+        while not self.stopped:
+            job = self.claim()
+            if job is None:
+                break
+            self.execute(job)
+            done += 1
+        return done
+
+    def run(self):
+        while not self.stopped:
+            self.release_stale()
+            if not self.run_pending():
+                time.sleep(self.poll_interval)
+
+    def stop(self, *args):
+        self.stopped = True
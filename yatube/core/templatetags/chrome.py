@@ -0,0 +1,33 @@
+from django import template
+
+register = template.Library()
+
+
+class OnceNode(template.Node):
+    def __init__(self, nodelist, vary_on):
+        self.nodelist = nodelist
+        self.vary_on = vary_on
+        self.rendered = {}
+
+    def render(self, context):
+        key = tuple(var.resolve(context) for var in self.vary_on)
+        if key not in self.rendered:
+            self.rendered[key] = self.nodelist.render(context)
+        return self.rendered[key]
+
+
+@register.tag
+def once(parser, token):
+    """Рендерит блок один раз на каждое сочетание значений аргументов.
+
+    Результат хранится в скомпилированном шаблоне: с кэширующим
+    загрузчиком — до перезапуска процесса, без него — на один рендер.
+    Блок не должен зависеть ни от чего, кроме аргументов.
+
+        {% once user.is_authenticated %}...{% endonce %}
+    """
+    vary_on = [parser.compile_filter(bit)
+               for bit in token.split_contents()[1:]]
+    nodelist = parser.parse(('endonce',))
+    parser.delete_first_token()
+    return OnceNode(nodelist, vary_on)
@@ -0,0 +1,66 @@
+import logging
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve
+
+# пароли тестовых пользователей не нуждаются в стойкости, а MD5 в сотни
+# раз быстрее PBKDF2; в настройках такого профиля нет намеренно
+FAST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def fast_password_hashers():
+    """override_settings с MD5 перед хэшерами профиля.
+
+    Общий для manage.py test и py.test (tests/conftest.py).
+    """
+    return override_settings(
+        PASSWORD_HASHERS=FAST_PASSWORD_HASHERS + settings.PASSWORD_HASHERS)
+
+
+# превышения бюджета проверяет QueryBudgetTestMixin; в выводе тестов,
+# где кэши нарочно холодные, предупреждения только мешают
+QUIET_LOGGERS = ('core.query_budget',)
+
+
+class TestRunner(DiscoverRunner):
+    """manage.py test с быстрым хэшированием паролей и без шума в логах."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.fast_hashers = fast_password_hashers()
+        self.fast_hashers.enable()
+        self.null_handler = logging.NullHandler()
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).addHandler(self.null_handler)
+
+    def teardown_test_environment(self, **kwargs):
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).removeHandler(self.null_handler)
+        self.fast_hashers.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetTestMixin:
+    """Проверки для TestCase: представление укладывается в свой бюджет."""
+
+    def assertWithinQueryBudget(self, url, client=None, method='get',
+                                **extra):
+        client = client or self.client
+        view = resolve(urlsplit(url).path).func
+        budget = getattr(view, 'query_budget', None)
+        if budget is None:
+            self.fail(f'У представления {view.__name__} '
+                      f'не объявлен бюджет запросов')
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, **extra)
+        if len(queries) > budget:
+            executed = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(queries.captured_queries, 1))
+            self.fail(f'{url}: {len(queries)} запросов при бюджете '
+                      f'{budget}:\n{executed}')
+        return response
@@ -0,0 +1,509 @@
+import email
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import timedelta
+from email import policy
+from io import StringIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template import Context, Template, engines
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import cache
+from core.admin import TaskAdmin
+from core.cache import LocMemCache, MmapCache
+from core.checks import CACHED_SESSION_ENGINES, check_session_cache
+from core.db import apply_pragmas
+from core.models import OutgoingMail, Task
+from core.smtp import DebuggingSMTPServer
+from core.staticfiles import IMMUTABLE, SHORT, StaticFilesApplication
+from core.tasks import Worker, task
+from core.templating import template_names, warmup
+
+User = get_user_model()
+
+calls = []
+
+
+@task(name='core.tests.remember')
+def remember(value):
+    calls.append(value)
+
+
+@task(name='core.tests.explode', max_attempts=2, retry_delay=60)
+def explode():
+    raise RuntimeError('Сбой')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_key_collapses_pending_duplicates(self):
+        """Задача с тем же ключом ставится один раз, пока ждёт запуска."""
+        remember.enqueue(key='same', value=1)
+        remember.enqueue(key='same', value=2)
+        remember.enqueue(value=3)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(Worker().run_pending(), 2)
+        self.assertEqual(calls, [1, 3])
+        self.assertFalse(Task.objects.exists())
+
+    def test_key_is_free_once_task_started(self):
+        """Во время выполнения задачу с тем же ключом можно поставить."""
+        remember.enqueue(key='same', value=1)
+        worker = Worker()
+        job = worker.claim()
+        remember.enqueue(key='same', value=2)
+        remember.enqueue(key='same', value=3)
+        worker.execute(job)
+        worker.run_pending()
+        self.assertEqual(calls, [1, 2])
+
+    def test_failed_task_retries_with_backoff(self):
+        """Упавшая задача повторяется позже, затем помечается ошибкой."""
+        explode.enqueue()
+        worker = Worker()
+        worker.run_pending()
+        job = Task.objects.get()
+        self.assertEqual(job.state, Task.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at,
+                           timezone.now() + timedelta(seconds=50))
+        self.assertIn('Сбой', job.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            worker.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.state, Task.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(TASKS_LEASE_TIMEOUT=60)
+    def test_stale_task_returns_to_queue(self):
+        """Задача, брошенная воркером, снова попадает в очередь."""
+        remember.enqueue(value=1)
+        Worker(name='lost').claim()
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        worker = Worker()
+        worker.release_stale()
+        worker.run_pending()
+        self.assertEqual(calls, [1])
+
+    def test_admin_retry_skips_pending_duplicates(self):
+        """Повтор из админки не ставит вторую задачу с тем же ключом."""
+        failed = [Task.objects.create(
+            name='core.tests.remember', key=key, state=Task.FAILED,
+            attempts=3, run_at=timezone.now()) for key in ('same', 'other')]
+        remember.enqueue(key='same', value=1)
+        TaskAdmin(Task, admin.site).retry(None, Task.objects.all())
+        self.assertFalse(Task.objects.filter(pk=failed[0].pk).exists())
+        retried = Task.objects.get(pk=failed[1].pk)
+        self.assertEqual((retried.state, retried.attempts),
+                         (Task.PENDING, 0))
+        self.assertEqual(
+            Task.objects.filter(key='same', state=Task.PENDING).count(), 1)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_immediately(self):
+        """В режиме TASKS_EAGER задача выполняется без очереди."""
+        remember.enqueue(value=1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_BATCH_SIZE=3,
+)
+class QueuedMailTest(TestCase):
+    def setUp(self):
+        self.server = DebuggingSMTPServer().start()
+        self.addCleanup(self.server.stop)
+        self.settings_override = self.settings(EMAIL_PORT=self.server.port)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_messages_wait_for_worker(self):
+        """Письма копятся в очереди и уходят пачками по соединению."""
+        messages = [
+            mail.EmailMessage(f'Тема {i}', 'Привет, мир', 'from@yatube.ru',
+                              [f'to{i}@yatube.ru'], bcc=['hidden@yatube.ru'])
+            for i in range(5)
+        ]
+        self.assertEqual(mail.get_connection().send_messages(messages), 5)
+        self.assertEqual(OutgoingMail.objects.count(), 5)
+        self.assertEqual(self.server.messages, [])
+
+        Worker().run_pending()
+        self.assertFalse(OutgoingMail.objects.exists())
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(len(self.server.messages), 5)
+        envelope = self.server.messages[0]
+        self.assertEqual(envelope.rcpt_to,
+                         ['<to0@yatube.ru>', '<hidden@yatube.ru>'])
+        self.assertNotIn(b'hidden@yatube.ru', envelope.data)
+        message = email.message_from_bytes(
+            envelope.data, policy=policy.default)
+        self.assertEqual(message['Subject'], 'Тема 0')
+
+    def test_password_reset_does_not_send_in_request(self):
+        """Сброс пароля ставит письмо в очередь, а отправляет воркер."""
+        User.objects.create_user(username='Forgetful',
+                                 email='forgetful@yatube.ru',
+                                 password='secret-password')
+        self.client.post(reverse('users:password_reset'),
+                         {'email': 'forgetful@yatube.ru'})
+        self.assertEqual(self.server.connections, 0)
+        self.assertEqual(OutgoingMail.objects.count(), 1)
+        Worker().run_pending()
+        envelope, = self.server.messages
+        self.assertEqual(envelope.rcpt_to, ['<forgetful@yatube.ru>'])
+        self.assertIn(b'/auth/reset/', envelope.data)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=2)
+    def test_rejected_message_does_not_block_queue(self):
+        """Отвергнутое письмо не задерживает следующие и откладывается."""
+        self.server.rejected.add('bad@yatube.ru')
+        mail.send_mail('Плохое', 'Текст', 'from@yatube.ru', ['bad@yatube.ru'])
+        mail.send_mail('Хорошее', 'Текст', 'from@yatube.ru',
+                       ['good@yatube.ru'])
+        Worker().run_pending()
+        envelope, = self.server.messages
+        self.assertEqual(envelope.rcpt_to, ['<good@yatube.ru>'])
+        bad = OutgoingMail.objects.get()
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn('550', bad.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.mail', 'ERROR'):
+            Worker().run_pending()
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 2)
+        self.assertFalse(Task.objects.exists())
+        mail.send_mail('Новое', 'Текст', 'from@yatube.ru', ['new@yatube.ru'])
+        Worker().run_pending()
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(OutgoingMail.objects.get(), bad)
+
+    def test_failed_delivery_keeps_messages(self):
+        """Если сервер недоступен, письма остаются для повтора."""
+        mail.send_mail('Тема', 'Текст', 'from@yatube.ru', ['to@yatube.ru'])
+        self.server.stop()
+        Worker().run_pending()
+        mail_row = OutgoingMail.objects.get()
+        self.assertIsNone(mail_row.claimed_at)
+        job = Task.objects.get()
+        self.assertEqual(job.state, Task.PENDING)
+        self.assertEqual(job.attempts, 1)
+
+
+class SessionsTest(TestCase):
+    def test_clear_expired_sessions_in_batches(self):
+        """Команда удаляет все истёкшие сессии пачками, живые остаются."""
+        for expiry in (-60, -60, -60, 60):
+            session = SessionStore()
+            session.set_expiry(expiry)
+            session.create()
+        call_command('clear_expired_sessions', batch_size=2,
+                     stdout=StringIO())
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertGreater(Session.objects.get().expire_date, timezone.now())
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_reads_session_from_cache(self):
+        """С cached_db сессия не читается из БД на каждой странице."""
+        cache.clear_all()
+        user = User.objects.create_user(username='Cached')
+        self.client.force_login(user)
+        self.client.get(reverse('posts:index'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:index'))
+        for query in queries.captured_queries:
+            self.assertNotIn('django_session', query['sql'])
+
+
+class SessionCacheCheckTest(TestCase):
+    def test_cached_sessions_need_shared_cache(self):
+        """Сессии в кэше процесса отвергаются проверкой core.E001."""
+        for engine in CACHED_SESSION_ENGINES:
+            with self.subTest(engine=engine), self.settings(
+                    SESSION_ENGINE=engine):
+                errors = check_session_cache(None)
+                self.assertEqual([error.id for error in errors],
+                                 ['core.E001'])
+        with self.settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.assertEqual(check_session_cache(None), [])
+
+    def test_shared_cache_allows_cached_sessions(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {
+            'BACKEND': 'core.cache.MmapCache',
+            'LOCATION': os.path.join(directory.name, 'sessions.cache'),
+        }
+        with self.settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+                CACHES={**settings.CACHES, 'sessions': shared}):
+            self.assertEqual(check_session_cache(None), [])
+
+
+class CacheBackendTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'test.cache')
+
+    def mmap_cache(self, entries=16, slot_size=256):
+        return MmapCache(self.path, {
+            'OPTIONS': {'MAX_ENTRIES': entries, 'SLOT_SIZE': slot_size}})
+
+    def test_local_cache_counts_hits_and_evictions(self):
+        backend = LocMemCache('test-stats', {'OPTIONS': {'MAX_ENTRIES': 3}})
+        for number in range(4):
+            backend.set(f'key-{number}', number)
+        backend.get('key-3')
+        backend.get('missing')
+        self.assertEqual(backend.stats(), {
+            'hits': 1, 'misses': 1, 'sets': 4, 'evictions': 1})
+
+    def test_mmap_cache_operations(self):
+        backend = self.mmap_cache()
+        backend.set('counter', 1)
+        self.assertEqual(backend.incr('counter', 2), 3)
+        self.assertFalse(backend.add('counter', 10))
+        backend.set('expired', 1, timeout=-1)
+        self.assertIsNone(backend.get('expired'))
+        backend.set('huge', 'x' * 1000)
+        self.assertIsNone(backend.get('huge'))
+        backend.delete('counter')
+        self.assertIsNone(backend.get('counter'))
+
+    def test_mmap_cache_evicts_when_full(self):
+        backend = self.mmap_cache(entries=4)
+        for number in range(10):
+            backend.set(f'key-{number}', number)
+        self.assertEqual(backend.get('key-9'), 9)
+        stats = backend.stats()
+        self.assertEqual(stats['sets'], 10)
+        self.assertEqual(stats['evictions'], 6)
+
+    def test_mmap_cache_is_shared_between_processes(self):
+        """Запись и счётчики из дочернего процесса видны родителю."""
+        backend = self.mmap_cache()
+        backend.get('missing')
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self.mmap_cache().set('from-child', 'привет')
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(backend.get('from-child'), 'привет')
+        self.assertEqual(backend.stats()['misses'], 1)
+        self.assertEqual(backend.stats()['sets'], 1)
+
+    def test_mmap_cache_rejects_other_geometry(self):
+        self.mmap_cache().set('key', 1)
+        with self.assertRaises(ImproperlyConfigured):
+            self.mmap_cache(slot_size=512).get('key')
+
+
+class SQLiteTuningTest(TestCase):
+    def connect(self, path, pragmas):
+        raw = sqlite3.connect(path, timeout=0, isolation_level=None)
+        self.addCleanup(raw.close)
+        apply_pragmas(raw, pragmas)
+        return raw
+
+    def commit_during_read(self, pragmas):
+        """Пытается записать, пока другое соединение читает."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+        writer = self.connect(path, pragmas)
+        writer.execute('CREATE TABLE post (text TEXT)')
+        reader = self.connect(path, pragmas)
+        reader.execute('BEGIN')
+        reader.execute('SELECT COUNT(*) FROM post').fetchone()
+        writer.execute("INSERT INTO post VALUES ('новый')")
+        return reader.execute('SELECT COUNT(*) FROM post').fetchone()[0]
+
+    def test_wal_does_not_block_writer_on_readers(self):
+        """В WAL запись не ждёт читателя, а он видит свой снимок."""
+        self.assertEqual(self.commit_during_read(settings.SQLITE_PRAGMAS), 0)
+
+    def test_rollback_journal_blocks_writer(self):
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            self.commit_during_read({'journal_mode': 'DELETE'})
+
+    def test_pragmas_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+
+PRODUCTION_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': settings.TEMPLATE_LOADERS['production'],
+    },
+}]
+
+
+class TemplateWarmupTest(TestCase):
+    @override_settings(TEMPLATES=PRODUCTION_TEMPLATES)
+    def test_pages_render_from_warm_cache(self):
+        """После прогрева страницы не разбирают шаблоны заново."""
+        self.assertEqual(warmup(), len(template_names()))
+        cache.clear_all()
+        loader = engines['django'].engine.template_loaders[0]
+        warmed = dict(loader.get_template_cache)
+        self.assertIn('base.html', warmed)
+        self.client.get(reverse('posts:index'))
+        for name, template in warmed.items():
+            self.assertIs(loader.get_template_cache[name], template)
+        self.assertEqual(
+            [name for name in loader.get_template_cache
+             if name not in warmed and not name.startswith('django/')],
+            [])
+
+    def test_warmup_skipped_without_cached_loader(self):
+        self.assertEqual(warmup(), 0)
+
+    def test_compile_times_command(self):
+        output = StringIO()
+        call_command('template_compile_times', repeat=1, stdout=output)
+        self.assertIn('posts/post_place.html', output.getvalue())
+        with self.assertRaisesMessage(CommandError, 'base.html'):
+            call_command('template_compile_times', repeat=1, max_ms=0,
+                         stdout=StringIO())
+
+
+class ChromeTest(TestCase):
+    def test_once_renders_block_per_argument_values(self):
+        template = Template(
+            '{% load chrome %}{% once flag %}{{ value }}{% endonce %}')
+        render = (lambda **context: template.render(Context(context)))
+        self.assertEqual(render(flag=True, value=1), '1')
+        self.assertEqual(render(flag=True, value=2), '1')
+        self.assertEqual(render(flag=False, value=3), '3')
+
+    @override_settings(TEMPLATES=PRODUCTION_TEMPLATES)
+    def test_cached_header_keeps_user_and_active_link(self):
+        """Закэшированное меню не путает пользователей и страницы."""
+        cache.clear_all()
+        for username in ('first', 'second'):
+            self.client.force_login(User.objects.create_user(username))
+            response = self.client.get(reverse('posts:post_create'))
+            self.assertContains(response, f'Пользователь: {username}')
+            self.assertRegex(
+                response.content.decode(),
+                r'active"\s+href="%s"' % reverse('posts:post_create'))
+        self.assertNotContains(response, 'Пользователь: first')
+        self.client.logout()
+        response = self.client.get(reverse('users:login'))
+        self.assertNotContains(response, 'Пользователь:')
+        self.assertContains(response, str(timezone.now().year))
+
+
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE='core.staticfiles.CompressedManifestStorage')
+        cls.static_settings.enable()
+        # сборка небыстрая: одна на все тесты класса
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as manifest:
+            cls.hashed = json.load(manifest)['paths']['css/bootstrap.min.css']
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.static_settings.disable()
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def request(self, path, **environ):
+        environ['PATH_INFO'] = path
+        setup_testing_defaults(environ)
+        status = {}
+
+        def start_response(code, headers):
+            status['code'] = code
+            status['headers'] = dict(headers)
+
+        def application(environ, start_response):
+            start_response('404 Not Found', [])
+            return [b'django']
+
+        body = b''.join(StaticFilesApplication(application)(
+            environ, start_response))
+        return status['code'], status['headers'], body
+
+    def test_build_writes_hashed_and_compressed_files(self):
+        self.assertNotEqual(self.hashed, 'css/bootstrap.min.css')
+        path = os.path.join(self.root, self.hashed)
+        with open(path, 'rb') as original, \
+                open(path + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()),
+                             original.read())
+        self.assertTrue(os.path.exists(path + '.br'))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.root, 'img/logo.png.gz')))
+
+    def test_static_tag_uses_manifest(self):
+        page = Template(
+            "{% load static %}{% static 'css/bootstrap.min.css' %}").render(
+                Context())
+        self.assertEqual(page, settings.STATIC_URL + self.hashed)
+
+    def test_handler_serves_precompressed_files(self):
+        url = settings.STATIC_URL + self.hashed
+        code, headers, body = self.request(
+            url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(code, '200 OK')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        with open(os.path.join(self.root, self.hashed), 'rb') as original:
+            self.assertEqual(gzip.decompress(body), original.read())
+        code, _, body = self.request(
+            url, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual((code, body), ('304 Not Modified', b''))
+        code, headers, _ = self.request(url)
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_handler_leaves_other_paths_to_django(self):
+        _, headers, _ = self.request(
+            settings.STATIC_URL + 'css/bootstrap.min.css')
+        self.assertEqual(headers['Cache-Control'], SHORT)
+        code, _, body = self.request(settings.STATIC_URL + '../manage.py')
+        self.assertEqual((code, body), ('404 Not Found', b'django'))
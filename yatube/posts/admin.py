@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import search
 from .models import Post, Group
 
 
@@ -16,6 +17,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        terms = search.query_terms(search_term)
+        if not terms:
+            return queryset, False
+        return search.search_posts(terms, queryset), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
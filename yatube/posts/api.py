@@ -0,0 +1,198 @@
+import base64
+import binascii
+from functools import wraps
+
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .models import Group, Post, User
+from .paginators import (CURSOR_ORDERING, decode_cursor, make_cursor,
+                         older_than)
+
+API_LIMIT = 20
+MAX_API_LIMIT = 100
+GROUP_ORDERING = ('title', 'id')
+
+# имя поля в ответе → путь для values(); связанные модели подтягиваются
+# JOIN-ом только если клиент запросил их поля
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+AUTHOR_FIELDS = {
+    'id': 'id',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def api_view(view):
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return api_response({'error': str(error)}, status=error.status)
+    return wrapper
+
+
+def requested_fields(request, available):
+    """Поля из ?fields=a,b; без параметра — все доступные."""
+    param = request.GET.get('fields')
+    if not param:
+        return list(available)
+    fields = [name.strip() for name in param.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.GET.get('limit', API_LIMIT))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return min(max(limit, 1), MAX_API_LIMIT)
+
+
+def make_group_cursor(title, pk):
+    raw = f'{title}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_group_cursor(token):
+    """Возвращает пару (title, id) или None для битого токена."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        title, pk = raw.rsplit('|', 1)
+        return title, int(pk)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def requested_position(request, decode):
+    """Позиция из ?after= или None, если параметра нет."""
+    token = request.GET.get('after')
+    if not token:
+        return None
+    position = decode(token)
+    if position is None:
+        raise ApiError('Некорректный курсор')
+    return position
+
+
+def limited_rows(rows, limit, cursor):
+    """Не больше limit строк и курсор следующей страницы, если она есть.
+
+    rows выбирается с запасом в одну строку: так конец списка виден без
+    отдельного COUNT(*).
+    """
+    rows = list(rows[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, cursor(rows[-1])
+
+
+def project(rows, fields, available):
+    return [{name: row[available[name]] for name in fields} for row in rows]
+
+
+def get_one(queryset, fields, available, **lookup):
+    row = queryset.filter(**lookup).values(
+        *(available[name] for name in fields)).first()
+    if row is None:
+        raise ApiError('Не найдено', status=404)
+    return project([row], fields, available)[0]
+
+
+@api_view
+def post_list(request):
+    fields = requested_fields(request, POST_FIELDS)
+    limit = requested_limit(request)
+    posts = Post.objects.order_by(*CURSOR_ORDERING)
+    if request.GET.get('group'):
+        posts = posts.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        posts = posts.filter(author__username=request.GET['author'])
+    position = requested_position(request, decode_cursor)
+    if position is not None:
+        posts = older_than(posts, *position)
+    paths = {POST_FIELDS[name] for name in fields} | {'id', 'pub_date'}
+    rows, next_cursor = limited_rows(
+        posts.values(*paths), limit,
+        lambda row: make_cursor(row['pub_date'], row['id']))
+    return api_response({
+        'results': project(rows, fields, POST_FIELDS),
+        'next': next_cursor,
+    })
+
+
+@api_view
+def post_item(request, post_id):
+    fields = requested_fields(request, POST_FIELDS)
+    return api_response(
+        get_one(Post.objects, fields, POST_FIELDS, pk=post_id))
+
+
+@api_view
+def group_list(request):
+    fields = requested_fields(request, GROUP_FIELDS)
+    limit = requested_limit(request)
+    groups = Group.objects.order_by(*GROUP_ORDERING)
+    position = requested_position(request, decode_group_cursor)
+    if position is not None:
+        title, pk = position
+        groups = groups.filter(
+            Q(title__gte=title), Q(title__gt=title) | Q(id__gt=pk))
+    paths = {GROUP_FIELDS[name] for name in fields} | {'id', 'title'}
+    rows, next_cursor = limited_rows(
+        groups.values(*paths), limit,
+        lambda row: make_group_cursor(row['title'], row['id']))
+    return api_response({
+        'results': project(rows, fields, GROUP_FIELDS),
+        'next': next_cursor,
+    })
+
+
+@api_view
+def group_item(request, slug):
+    fields = requested_fields(request, GROUP_FIELDS)
+    return api_response(
+        get_one(Group.objects, fields, GROUP_FIELDS, slug=slug))
+
+
+@api_view
+def author_item(request, username):
+    fields = requested_fields(request, AUTHOR_FIELDS)
+    return api_response(
+        get_one(User.objects, fields, AUTHOR_FIELDS, username=username))
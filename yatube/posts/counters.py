@@ -0,0 +1,32 @@
+from django.conf import settings
+
+from core.cache import counters as cache
+
+from .models import Post
+
+KEY_PREFIX = 'posts:count'
+# счётчики авторов и групп хранятся в AuthorStats и GroupStats
+TOTAL_KEY = f'{KEY_PREFIX}:all'
+
+
+def total_count():
+    value = cache.get(TOTAL_KEY)
+    if value is None:
+        value = Post.objects.count()
+        cache.set(TOTAL_KEY, value, settings.POSTS_COUNTERS_TIMEOUT)
+    return value
+
+
+def shift_total(delta):
+    try:
+        cache.incr(TOTAL_KEY, delta)
+    except ValueError:
+        # счётчика ещё нет в кэше — его посчитает первое чтение
+        pass
+
+
+def reconcile():
+    """Пересчитывает общий счётчик постов."""
+    value = Post.objects.count()
+    cache.set(TOTAL_KEY, value, settings.POSTS_COUNTERS_TIMEOUT)
+    return value
@@ -1,12 +1,32 @@
 from django.forms import ModelForm
 
 from .models import Post
+from .uploads import RejectedUpload
 
 
 class PostForm(ModelForm):
     class Meta:
         model = Post
-        labels = {'group': 'Группа', 'text': 'Текст поста'}
+        labels = {'group': 'Группа', 'text': 'Текст поста',
+                  'image': 'Картинка'}
         help_texts = {'group': 'Выберите группу',
-                      'text': 'Введите текст поста'}
-        fields = ['text', 'group']
+                      'text': 'Введите текст поста',
+                      'image': 'Загрузите картинку'}
+        fields = ['text', 'group', 'image']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # отклонённые при приёме файлы становятся ошибками полей
+        self.upload_errors = {
+            name: upload.error for name, upload in self.files.items()
+            if isinstance(upload, RejectedUpload)
+        }
+        if self.upload_errors:
+            self.files = self.files.copy()
+            for name in self.upload_errors:
+                del self.files[name]
+
+    def clean(self):
+        for name, error in self.upload_errors.items():
+            self.add_error(name, error)
+        return super().clean()
@@ -0,0 +1,36 @@
+import hashlib
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from core.cache import fragments as cache
+
+KEY_PREFIX = 'posts:card'
+
+
+def card_version(post):
+    """Версия данных автора и группы, которые выводит карточка.
+
+    Ключ меняется вместе с ними, поэтому после переименования старые
+    карточки не нужно удалять из кэша каждого процесса: они просто
+    перестают читаться и истекают сами.
+    """
+    author, group = post.author, post.group
+    owners = (author.username, author.first_name, author.last_name,
+              group.slug if group else '')
+    return hashlib.md5('\0'.join(owners).encode()).hexdigest()[:12]
+
+
+def card_key(template_name, pk, updated_at, version):
+    return (f'{KEY_PREFIX}:{template_name}:{pk}:{updated_at.timestamp()}:'
+            f'{version}')
+
+
+def render_card(post, template_name):
+    key = card_key(template_name, post.pk, post.updated_at,
+                   card_version(post))
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, {'post': post})
+        cache.set(key, html, settings.POST_CARDS_TIMEOUT)
+    return html
@@ -0,0 +1,97 @@
+"""Картинки постов.
+
+Оригинал и уменьшенные копии хранятся под хэшем содержимого, так что
+одинаковые файлы не дублируются и их можно кэшировать навсегда. Копии
+для ширин POSTS_IMAGE_WIDTHS делает воркер, а их имена записываются
+в Post.thumbnails; srcset собирается из этого поля без обращений
+к хранилищу.
+"""
+import hashlib
+import io
+import json
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from PIL import Image
+
+UPLOAD_DIR = 'posts'
+THUMBNAILS_DIR = 'posts/thumbs'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файл с тем же именем уже содержит те же байты — не пишем заново."""
+
+    def get_available_name(self, name, max_length=None):
+        # другого имени у этого содержимого нет; FileSystemStorage._save
+        # ищет новое имя и после гонки, поэтому выходим из его цикла
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def save(self, name, content, max_length=None):
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            # файл уже есть или его только что записал другой процесс
+            return name
+
+
+storage = ContentAddressedStorage()
+
+
+def hashed_name(directory, chunks, extension):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return f'{directory}/{digest.hexdigest()[:32]}{extension.lower()}'
+
+
+def upload_to(instance, filename):
+    upload = instance.image.file
+    if hasattr(upload, 'stored_name'):
+        # хэш уже посчитан при приёме файла
+        return upload.stored_name
+    return hashed_name(UPLOAD_DIR, upload.chunks(),
+                       os.path.splitext(filename)[1])
+
+
+def _encode(image, has_alpha):
+    buffer = io.BytesIO()
+    if has_alpha:
+        image.save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue(), '.png'
+    image.save(buffer, 'JPEG', quality=85, optimize=True, progressive=True)
+    return buffer.getvalue(), '.jpg'
+
+
+def make_thumbnails(image):
+    """Сохраняет копии картинки поменьше; пары (ширина, имя) по возрастанию.
+
+    Последняя пара — сам оригинал: копии крупнее него не делаются.
+    """
+    with image.open('rb'):
+        source = Image.open(image)
+        source.load()
+    has_alpha = source.mode in ('RGBA', 'LA') or 'transparency' in source.info
+    source = source.convert('RGBA' if has_alpha else 'RGB')
+    sizes = []
+    for width in sorted(settings.POSTS_IMAGE_WIDTHS):
+        if width >= source.width:
+            break
+        copy = source.copy()
+        copy.thumbnail((width, source.height), Image.LANCZOS)
+        content, extension = _encode(copy, has_alpha)
+        name = storage.save(
+            hashed_name(THUMBNAILS_DIR, [content], extension),
+            ContentFile(content))
+        sizes.append((copy.width, name))
+    sizes.append((source.width, image.name))
+    return sizes
+
+
+def srcset(thumbnails):
+    return ', '.join(
+        f'{storage.url(name)} {width}w'
+        for width, name in json.loads(thumbnails))
@@ -0,0 +1,60 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from posts.models import Post
+from posts.paginators import CURSOR_ORDERING, newer_than, older_than
+from posts.views import COUNT_POSTS
+
+# признаки плана, при которых запрос ленты перестаёт быть индексным
+BAD_PLAN_PATTERNS = {
+    'sqlite': (
+        re.compile(r'SCAN (TABLE )?posts_post(?! USING)'),
+        re.compile(r'TEMP B-TREE'),
+    ),
+    'postgresql': (
+        re.compile(r'Seq Scan on posts_post'),
+        re.compile(r'\bSort\b'),
+    ),
+}
+
+
+def feed_querysets():
+    feeds = {
+        'index': Post.objects.select_related('author', 'group'),
+        'group_list': Post.objects.filter(group_id=1).select_related(
+            'author'),
+        'profile': Post.objects.filter(author_id=1).select_related(
+            'author', 'group'),
+    }
+    now = timezone.now()
+    for name, queryset in feeds.items():
+        queryset = queryset.order_by(*CURSOR_ORDERING)
+        yield f'{name}: page', queryset[:COUNT_POSTS]
+        yield f'{name}: after', older_than(queryset, now, 1)[:COUNT_POSTS]
+        yield f'{name}: before', newer_than(
+            queryset, now, 1).reverse()[:COUNT_POSTS]
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов лент и завершается ошибкой, '
+            'если какой-то из них сканирует таблицу постов или сортирует '
+            'её во временном B-дереве.')
+
+    def handle(self, *args, **options):
+        patterns = BAD_PLAN_PATTERNS.get(connection.vendor)
+        if patterns is None:
+            raise CommandError(
+                f'Неизвестный движок базы данных: {connection.vendor}')
+        failed = []
+        for name, queryset in feed_querysets():
+            plan = queryset.explain()
+            self.stdout.write(f'{name}\n{plan}\n')
+            if any(pattern.search(plan) for pattern in patterns):
+                failed.append(name)
+        if failed:
+            raise CommandError(
+                'Запросы без подходящего индекса: ' + ', '.join(failed))
+        self.stdout.write(self.style.SUCCESS('Все запросы лент индексные'))
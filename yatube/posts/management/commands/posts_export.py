@@ -0,0 +1,40 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.transfer import FORMATS, RowWriter, guess_format
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты в JSON Lines или CSV, читая их из БД '
+            'порциями через iterator().')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdout.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        rows = Post.objects.order_by('id').values_list(
+            'text', 'pub_date', 'author__username', 'group__slug',
+        ).iterator(chunk_size=options['batch_size'])
+        started = time.monotonic()
+        exported = 0
+        stream = (sys.stdout if path == '-'
+                  else open(path, 'w', newline='', encoding='utf-8'))
+        try:
+            writer = RowWriter(stream, fmt)
+            for text, pub_date, author, group in rows:
+                writer.write((text, pub_date.isoformat(), author, group or ''))
+                exported += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено: {exported}, '
+            f'{exported / max(elapsed, 1e-6):.0f} строк/с')
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import timeline
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Раскладывает посты по лентам подписчиков. Нужна после '
+            'загрузки постов в обход сигналов, например posts_import.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Рассылать посты не старше стольких дней.')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        post_ids = Post.objects.filter(pub_date__gte=since).order_by(
+            'pub_date').values_list('id', flat=True)
+        sent = 0
+        for post_id in post_ids.iterator():
+            timeline.fanout(post_id)
+            sent += 1
+        self.stdout.write(self.style.SUCCESS(f'Разослано постов: {sent}'))
@@ -0,0 +1,129 @@
+import sys
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import counters, page_cache, stats, tasks
+from posts.models import Group, Post, User
+from posts.transfer import FORMATS, guess_format, keep_post_dates, read_rows
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты из файла JSON Lines или CSV пачками через '
+            'bulk_create. Авторы ищутся по username, группы — по slug.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--reindex', action='store_true',
+            help='Перестроить весь поисковый индекс после загрузки; '
+                 'загруженные посты индексирует воркер и без этого.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        self.batch_size = options['batch_size']
+        self.authors = {}
+        self.groups = {}
+        self.imported = self.skipped = 0
+        started = time.monotonic()
+        stream = (sys.stdin if path == '-'
+                  else open(path, newline='', encoding='utf-8'))
+        try:
+            with keep_post_dates():
+                self.load(read_rows(stream, fmt))
+        except (ValueError, KeyError) as error:
+            raise CommandError(f'Некорректная запись: {error}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            # пачки до ошибочной записи уже сохранены
+            if self.imported:
+                self.refresh()
+        elapsed = time.monotonic() - started
+        if options['reindex']:
+            call_command('posts_reindex', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {self.imported}, пропущено: {self.skipped}, '
+            f'{self.imported / max(elapsed, 1e-6):.0f} строк/с'))
+
+    def refresh(self):
+        """Пересчитывает итоги и сбрасывает страницы после загрузки."""
+        counters.reconcile()
+        stats.rebuild()
+        page_cache.purge(
+            page_cache.FEED_TAG,
+            *(page_cache.AUTHOR_TAG.format(username=username)
+              for username, pk in self.authors.items() if pk),
+            *(page_cache.GROUP_TAG.format(slug=slug)
+              for slug, pk in self.groups.items() if pk))
+
+    def load(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+
+    @transaction.atomic
+    def flush(self, rows):
+        if not rows:
+            return
+        self.resolve(self.authors, User, 'username',
+                     {row['author'] for row in rows})
+        self.resolve(self.groups, Group, 'slug',
+                     {row['group'] for row in rows if row.get('group')})
+        posts = []
+        for row in rows:
+            author_id = self.authors.get(row['author'])
+            group_id = self.groups.get(row.get('group')) or None
+            if author_id is None or (row.get('group') and group_id is None):
+                self.skipped += 1
+                continue
+            pub_date = self.parse_date(row.get('pub_date'))
+            posts.append(Post(
+                text=row['text'],
+                pub_date=pub_date,
+                updated_at=pub_date,
+                author_id=author_id,
+                group_id=group_id,
+            ))
+        if not posts:
+            return
+        # bulk_create в SQLite не возвращает id: берём диапазон новых строк
+        last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        Post.objects.bulk_create(posts)
+        tasks.index_imported_posts.enqueue(
+            first_id=last_id + 1,
+            last_id=Post.objects.aggregate(last=Max('id'))['last'])
+        self.imported += len(posts)
+
+    def parse_date(self, value):
+        if not value:
+            return timezone.now()
+        pub_date = parse_datetime(value)
+        if pub_date is None:
+            raise ValueError(f'дата {value!r}')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date, timezone.utc)
+        return pub_date
+
+    def resolve(self, lookup, model, field, values):
+        """Дополняет карту значение → id недостающими записями из БД."""
+        missing = [value for value in values if value not in lookup]
+        if not missing:
+            return
+        found = model.objects.filter(**{f'{field}__in': missing})
+        lookup.update(found.values_list(field, 'id'))
+        # отсутствующие в БД значения запоминаем, чтобы не искать снова
+        lookup.update({value: None for value in missing
+                       if value not in lookup})
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters, stats
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчик постов и итоги авторов и групп. '
+            'Запускается периодически, например из cron.')
+
+    def handle(self, *args, **options):
+        total = counters.reconcile()
+        authors, groups = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов: {total}, авторов: {authors}, групп: {groups}'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import search
+from posts.models import Post, PostTerm
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов индексировать за одну транзакцию.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        PostTerm.objects.all().delete()
+        posts = Post.objects.only('id', 'text').order_by('id')
+        indexed = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) == batch_size:
+                indexed += self.index_batch(batch)
+                batch = []
+        indexed += self.index_batch(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано постов: {indexed}'))
+
+    @transaction.atomic
+    def index_batch(self, posts):
+        terms = [term for post in posts for term in search.post_terms(post)]
+        PostTerm.objects.bulk_create(terms, batch_size=1000)
+        return len(posts)
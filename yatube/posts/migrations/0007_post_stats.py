@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    """Итоги по уже опубликованным постам, как в posts.stats.rebuild()."""
+    Post = apps.get_model('posts', 'Post')
+    for model_name, owner in (('AuthorStats', 'author_id'),
+                              ('GroupStats', 'group_id')):
+        model = apps.get_model('posts', model_name)
+        totals = (
+            Post.objects.filter(**{f'{owner}__isnull': False}).order_by()
+            .values(owner).annotate(posts_count=models.Count('id'),
+                                    last_post_at=models.Max('pub_date'))
+        )
+        model.objects.bulk_create(
+            (model(pk=row[owner], posts_count=row['posts_count'],
+                   last_post_at=row['last_post_at']) for row in totals),
+            batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0006_post_term'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('last_post_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('last_post_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
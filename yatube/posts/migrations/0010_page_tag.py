@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageTag',
+            fields=[
+                ('tag', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('version', models.CharField(max_length=48)),
+            ],
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from . import images
+
 User = get_user_model()
 
 
@@ -29,10 +31,14 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name=RELATED_NAME,
+        db_index=False,
     )
     group = models.ForeignKey(
         Group,
@@ -40,10 +46,191 @@ class Post(models.Model):
         blank=True,
         null=True,
         related_name=RELATED_NAME,
+        db_index=False,
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to=images.upload_to,
+        storage=images.storage,
+        blank=True,
+    )
+    # JSON-список пар (ширина, имя файла) из images.make_thumbnails
+    thumbnails = models.TextField(
+        blank=True,
+        editable=False,
     )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        # внешние ключи покрыты составными индексами как префиксы
+        indexes = (
+            models.Index(fields=('pub_date', 'id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', 'pub_date'),
+                         name='post_group_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+    @property
+    def image_srcset(self):
+        return images.srcset(self.thumbnails) if self.thumbnails else ''
+
+
+class PostTerm(models.Model):
+    """Запись обратного индекса: слово и число его вхождений в пост."""
+    term = models.CharField(
+        max_length=64,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='terms',
+        db_index=False,
+    )
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('term', 'post'),
+                                    name='post_term_unique'),
+        )
+        indexes = (
+            models.Index(fields=('post',), name='post_term_post_idx'),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class AuthorStats(models.Model):
+    """Итоги по постам автора, обновляются вместе с постами."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+    )
+    last_post_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class GroupStats(models.Model):
+    """Итоги по постам группы, обновляются вместе с постами."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+    )
+    last_post_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
+
+
+class PageTag(models.Model):
+    """Версия тега закэшированных страниц, общая для всех процессов."""
+    tag = models.CharField(
+        max_length=200,
+        primary_key=True,
+    )
+    version = models.CharField(
+        max_length=48,
+    )
+
+    def __str__(self):
+        return f'{self.tag}: {self.version}'
+
+
+class Follow(models.Model):
+    """Подписка пользователя на автора или на группу."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follows',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='followers',
+        db_index=False,
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='followers',
+        db_index=False,
+    )
+
+    class Meta:
+        # составные ключи начинаются с источника: по ним идёт рассылка
+        constraints = (
+            models.CheckConstraint(
+                check=(models.Q(author__isnull=True, group__isnull=False)
+                       | models.Q(author__isnull=False, group__isnull=True)),
+                name='follow_author_or_group',
+            ),
+            models.UniqueConstraint(fields=('author', 'user'),
+                                    name='follow_author_unique'),
+            models.UniqueConstraint(fields=('group', 'user'),
+                                    name='follow_group_unique'),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} → {self.author_id or self.group_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписчика; pub_date скопирован для сортировки."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        db_index=False,
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post')
+        constraints = (
+            models.UniqueConstraint(fields=('post', 'user'),
+                                    name='timeline_post_user_unique'),
+        )
+        indexes = (
+            models.Index(fields=('user', 'pub_date', 'post'),
+                         name='timeline_user_pub_date_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
@@ -0,0 +1,188 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from core.cache import pages as cache
+
+from .models import Group, PageTag, Post, User
+
+FEED_TAG = 'feed'
+GROUP_TAG = 'group:{slug}'
+AUTHOR_TAG = 'author:{username}'
+POST_TAG = 'post:{post_id}'
+
+# параметры запроса, по которым различаются закэшированные страницы
+VARY_PARAMS = ('page', 'after', 'before')
+
+
+def _new_version():
+    # время сброса тега служит и версией, и датой Last-Modified
+    return f'{time.time():.6f}-{uuid.uuid4().hex[:8]}'
+
+
+def _version_time(version):
+    timestamp = float(version.split('-', 1)[0])
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def _tag_versions(tags):
+    # версии лежат в БД, а не в кэше: кэш у каждого процесса может быть
+    # свой, и сброс в одном воркере не дошёл бы до остальных.
+    # У ни разу не сброшенного тега версия пустая
+    versions = dict(PageTag.objects.filter(tag__in=tags).values_list(
+        'tag', 'version'))
+    return [versions.get(tag, '') for tag in tags]
+
+
+def post_owner_tags(post_id):
+    """Теги автора и группы поста: его страница показывает их данные."""
+    owners = Post.objects.filter(pk=post_id).order_by().values_list(
+        'author__username', 'group__slug')
+    if not owners:
+        return []
+    (username, slug), = owners
+    tags = [AUTHOR_TAG.format(username=username)]
+    if slug:
+        tags.append(GROUP_TAG.format(slug=slug))
+    return tags
+
+
+def _page_versions(request, tags, kwargs):
+    """Версии тегов страницы. Теги-строки заполняются аргументами URL,
+    теги-функции вызываются с ними. Результат запоминается на запрос."""
+    if not hasattr(request, '_page_versions'):
+        page_tags = []
+        for tag in tags:
+            if callable(tag):
+                page_tags.extend(tag(**kwargs))
+            else:
+                page_tags.append(tag.format(**kwargs))
+        request._page_versions = _tag_versions(page_tags)
+    return request._page_versions
+
+
+def _page_params(request):
+    return [f'{name}={request.GET.get(name, "")}' for name in VARY_PARAMS]
+
+
+def page_key(request, versions):
+    raw = '|'.join([request.path, *_page_params(request), *versions])
+    return 'posts:page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def purge(*tags):
+    """Сбрасывает страницы с тегами: у тегов появляется новая версия."""
+    if not tags:
+        return
+    version = _new_version()
+    PageTag.objects.bulk_create(
+        [PageTag(tag=tag, version=version) for tag in set(tags)],
+        ignore_conflicts=True)
+    PageTag.objects.filter(tag__in=tags).update(version=version)
+
+
+def purge_post(post, group_ids=()):
+    tags = {
+        FEED_TAG,
+        POST_TAG.format(post_id=post.pk),
+        AUTHOR_TAG.format(username=post.author.username),
+    }
+    group_ids = {pk for pk in group_ids if pk is not None}
+    if group_ids:
+        slugs = Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True)
+        tags.update(GROUP_TAG.format(slug=slug) for slug in slugs)
+    purge(*tags)
+
+
+def purge_author(author):
+    """Сбрасывает страницы с именем автора, в том числе его групп."""
+    slugs = Group.objects.filter(posts__author=author).values_list(
+        'slug', flat=True).distinct()
+    purge(FEED_TAG, AUTHOR_TAG.format(username=author.username),
+          *(GROUP_TAG.format(slug=slug) for slug in slugs))
+
+
+def purge_group(group):
+    """Сбрасывает страницы с названием группы, в том числе её авторов."""
+    usernames = User.objects.filter(posts__group=group).values_list(
+        'username', flat=True).distinct()
+    purge(FEED_TAG, GROUP_TAG.format(slug=group.slug),
+          *(AUTHOR_TAG.format(username=name) for name in usernames))
+
+
+def cache_anonymous_page(*tags):
+    """Кэширует страницу для анонимных посетителей.
+
+    Теги — шаблоны строк, которые заполняются аргументами из URL, или
+    функции от этих аргументов, возвращающие список тегов.
+    Кэш выключен, пока POSTS_PAGE_CACHE_TIMEOUT равен нулю.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.POSTS_PAGE_CACHE_TIMEOUT
+            if (not timeout or request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            key = page_key(request, _page_versions(request, tags, kwargs))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(
+                        key,
+                        (response.content, response['Content-Type']),
+                        timeout,
+                    )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(*tags):
+    """Отдаёт 304 по ETag и Last-Modified до вызова представления.
+
+    Валидаторы строятся из версий тегов страницы: они читаются из БД
+    одним запросом и общие для всех процессов. Страница авторизованного
+    пользователя отличается шапкой, поэтому его id входит в ETag, а
+    Last-Modified ему не отправляется: по одной дате нельзя отличить его
+    страницу от гостевой.
+    """
+    def etag(request, *args, **kwargs):
+        versions = _page_versions(request, tags, kwargs)
+        raw = '|'.join([request.path, *_page_params(request), *versions,
+                        str(request.user.pk)])
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        versions = _page_versions(request, tags, kwargs)
+        if not all(versions):
+            # дата изменения неизвестна, остаётся только ETag
+            return None
+        return max(_version_time(version) for version in versions)
+
+    def decorator(view):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(
+            view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,236 @@
+import base64
+import binascii
+import collections.abc
+from datetime import datetime
+
+from django.core.paginator import (EmptyPage, Page, PageNotAnInteger,
+                                   Paginator)
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+CURSOR_ORDERING = ('-pub_date', '-id')
+PAGE_WINDOW = 2
+
+
+def make_cursor(pub_date, pk):
+    raw = f'{pub_date.isoformat()}|{pk}'
+    token = base64.urlsafe_b64encode(raw.encode())
+    return token.decode().rstrip('=')
+
+
+def encode_cursor(post):
+    return make_cursor(post.pub_date, post.pk)
+
+
+def decode_cursor(token):
+    """Возвращает пару (pub_date, id) или None для битого токена."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def older_than(queryset, pub_date, pk, pk_field='id'):
+    # нестрогое условие по pub_date даёт индексный поиск по диапазону,
+    # уточнение по id отсекает уже показанные посты с той же датой
+    return queryset.filter(
+        Q(pub_date__lte=pub_date),
+        Q(pub_date__lt=pub_date) | Q(**{f'{pk_field}__lt': pk}),
+    )
+
+
+def newer_than(queryset, pub_date, pk, pk_field='id'):
+    return queryset.filter(
+        Q(pub_date__gte=pub_date),
+        Q(pub_date__gt=pub_date) | Q(**{f'{pk_field}__gt': pk}),
+    )
+
+
+def slice_after(queryset, position, older, limit, pk_field='id'):
+    """До limit строк старше позиции или, при older=False, новее неё.
+
+    Более новые строки идут по возрастанию: от позиции к началу ленты.
+    """
+    queryset = queryset.order_by('-pub_date', f'-{pk_field}')
+    if not older:
+        queryset = newer_than(queryset, *position, pk_field).reverse()
+    elif position is not None:
+        queryset = older_than(queryset, *position, pk_field)
+    return list(queryset[:limit])
+
+
+class CursorLinksMixin:
+    """Курсоры соседних страниц: первая и последняя запись страницы."""
+
+    @property
+    def next_cursor(self):
+        if not len(self):
+            return None
+        return encode_cursor(self[-1])
+
+    @property
+    def previous_cursor(self):
+        if not len(self):
+            return None
+        return encode_cursor(self[0])
+
+
+class FeedPage(CursorLinksMixin, Page):
+    numbered = True
+
+    @property
+    def page_window(self):
+        """Номера страниц вокруг текущей; None — место для многоточия.
+
+        Первая и последняя страницы есть всегда, поэтому длина списка
+        не больше 2 * PAGE_WINDOW + 5 при любом числе страниц.
+        """
+        last = self.paginator.num_pages
+        start = max(self.number - PAGE_WINDOW, 1)
+        end = min(self.number + PAGE_WINDOW, last)
+        window = list(range(start, end + 1))
+        if start > 2:
+            window.insert(0, None)
+        if start > 1:
+            window.insert(0, 1)
+        if end < last - 1:
+            window.append(None)
+        if end < last:
+            window.append(last)
+        return window
+
+
+class FeedPaginator(Paginator):
+    """Постраничная навигация по номеру страницы (?page=N).
+
+    Ссылки соседних страниц строятся курсорами, если выборка упорядочена
+    по CURSOR_ORDERING; для иного порядка передаётся cursors=False.
+    Если передан count, общее число постов берётся из него, а не из
+    COUNT(*). Такой счётчик может отставать, поэтому номер страницы
+    не сверяется с num_pages, а пустая выборка считается концом ленты.
+    """
+
+    def __init__(self, object_list, per_page, count=None, cursors=True,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cursors = cursors
+        self.approximate = count is not None
+        if self.approximate:
+            self.count = count
+
+    def validate_number(self, number):
+        if not self.approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # счётчик завысил число страниц
+            return self.page(1)
+
+    def page(self, number):
+        if not self.approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        page = self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self)
+        if number > 1 and not len(page):
+            raise EmptyPage(_('That page contains no results'))
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage(CursorLinksMixin, collections.abc.Sequence):
+    """Страница keyset-пагинации.
+
+    Номеров страниц и общего числа записей у неё нет, поэтому это не
+    django.core.paginator.Page: переходы только по курсорам.
+    """
+
+    numbered = False
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id).
+
+    Каждая страница — один запрос с LIMIT per_page + 1 без OFFSET и
+    без COUNT(*), поэтому глубина страницы не влияет на её стоимость.
+    """
+
+    cursors = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_cursor_page(self, after=None, before=None):
+        if before:
+            position = decode_cursor(before)
+            if position is not None:
+                return self._page_before(position)
+        position = decode_cursor(after) if after else None
+        return self._page_after(position)
+
+    def fetch(self, position, older):
+        return slice_after(self.object_list, position, older,
+                           self.per_page + 1)
+
+    def _page_after(self, position):
+        rows = self.fetch(position, older=True)
+        has_next = len(rows) > self.per_page
+        return CursorPage(
+            rows[:self.per_page], self,
+            has_next=has_next,
+            has_previous=position is not None,
+        )
+
+    def _page_before(self, position):
+        rows = self.fetch(position, older=False)
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(
+            rows, self,
+            has_next=True,
+            has_previous=has_previous,
+        )
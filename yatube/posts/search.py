@@ -0,0 +1,84 @@
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post, PostTerm
+
+TERM_RE = re.compile(r'\w+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = PostTerm._meta.get_field('term').max_length
+MAX_QUERY_TERMS = 8
+
+
+def normalize(word):
+    return word.lower().replace('ё', 'е')[:MAX_TERM_LENGTH]
+
+
+def tokenize(text):
+    return [normalize(word) for word in TERM_RE.findall(text)
+            if len(word) >= MIN_TERM_LENGTH]
+
+
+def post_terms(post):
+    return [
+        PostTerm(term=term, post=post, weight=weight)
+        for term, weight in Counter(tokenize(str(post.text))).items()
+    ]
+
+
+@transaction.atomic
+def index_post(post):
+    PostTerm.objects.filter(post=post).delete()
+    PostTerm.objects.bulk_create(post_terms(post))
+
+
+@transaction.atomic
+def index_posts(posts):
+    """Переиндексирует посты queryset, например загруженные пачкой."""
+    PostTerm.objects.filter(post__in=posts).delete()
+    terms = [term for post in posts.only('id', 'text')
+             for term in post_terms(post)]
+    PostTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+def query_terms(query):
+    terms = []
+    for term in tokenize(query):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def search_posts(terms, queryset=None):
+    """Посты, содержащие все слова запроса, от самых релевантных.
+
+    Кандидаты выбираются по индексу (term, post), поэтому стоимость
+    запроса зависит от числа вхождений слов, а не от размера таблицы.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    if not terms:
+        return queryset.none()
+    return queryset.filter(terms__term__in=terms).annotate(
+        matched=Count('terms'),
+        score=Sum('terms__weight'),
+    ).filter(matched=len(terms)).order_by('-score', '-pub_date', '-id')
+
+
+def highlight(text, terms):
+    """Экранирует текст и выделяет в нём слова запроса тегом <mark>."""
+    terms = set(terms)
+    parts = []
+    position = 0
+    for match in TERM_RE.finditer(text):
+        if normalize(match.group()) not in terms:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f'<mark>{escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return mark_safe(''.join(parts))
@@ -0,0 +1,108 @@
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import counters, page_cache, stats, tasks
+from .models import Follow, Group, Post, User
+
+
+@receiver(post_init, sender=Post)
+def remember_post_owners(sender, instance, **kwargs):
+    # отложенные через only()/defer() поля не читаем, чтобы не ходить в БД
+    instance._saved_owners = (instance.__dict__.get('author_id'),
+                              instance.__dict__.get('group_id'))
+    instance._saved_image = _image_name(instance.__dict__.get('image'))
+
+
+def _image_name(image):
+    return getattr(image, 'name', image) or ''
+
+
+@receiver(pre_save, sender=Post)
+def forget_thumbnails(sender, instance, raw=False, **kwargs):
+    # копии старой картинки не подходят новой, их заново сделает воркер
+    if not raw and instance.image.name != instance._saved_image:
+        instance.thumbnails = ''
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    if raw:
+        return
+    # индекс и ленты строит воркер, в запросе остаются дешёвые UPDATE
+    # счётчиков и сброс кэша, от которых зависит страница после редиректа
+    if update_fields is None or 'text' in update_fields:
+        tasks.index_post.enqueue(key=f'index:{instance.pk}',
+                                 post_id=instance.pk)
+    previous = instance._saved_owners
+    owners = (instance.author_id, instance.group_id)
+    if created:
+        counters.shift_total(1)
+        stats.add_post(*owners, instance.pub_date)
+    elif previous[0] is not None and owners != previous:
+        stats.move_post(previous, owners, instance.pub_date)
+    if created or (previous[0] is not None and owners != previous):
+        # после смены группы ленты её подписчиков раскладываются заново
+        tasks.fanout_post.enqueue(key=f'fanout:{instance.pk}',
+                                  post_id=instance.pk)
+    if instance.image and instance.image.name != instance._saved_image:
+        tasks.make_thumbnails.enqueue(key=f'thumbnails:{instance.pk}',
+                                      post_id=instance.pk)
+    page_cache.purge_post(instance, group_ids=(previous[1], owners[1]))
+    instance._saved_owners = owners
+    instance._saved_image = instance.image.name or ''
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    owners = (instance.author_id, instance.group_id)
+    counters.shift_total(-1)
+    stats.remove_post(*owners)
+    page_cache.purge_post(instance, group_ids=(owners[1],))
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields=None,
+                 raw=False, **kwargs):
+    # вход в аккаунт сохраняет только last_login, страницы от него не зависят
+    if created or raw or update_fields == frozenset({'last_login'}):
+        return
+    page_cache.purge_author(instance)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    page_cache.purge_group(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # посты отвязываются от группы через UPDATE, updated_at не меняется
+    page_cache.purge_group(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _follow_changed(instance, stats.add_follower)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    _follow_changed(instance, stats.remove_follower)
+
+
+def _follow_changed(follow, update_stats):
+    # кнопка подписки на странице зависит от подписки, сбрасываем её версию
+    if follow.author_id is not None:
+        update_stats(follow.author_id)
+        username = User.objects.values_list('username', flat=True).filter(
+            pk=follow.author_id).first()
+        page_cache.purge(page_cache.AUTHOR_TAG.format(username=username))
+    else:
+        slug = Group.objects.values_list('slug', flat=True).filter(
+            pk=follow.group_id).first()
+        page_cache.purge(page_cache.GROUP_TAG.format(slug=slug))
@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Follow, GroupStats, Post
+
+
+def _latest_pub_date(**lookup):
+    # последний пост находится по составному индексу (владелец, pub_date)
+    return Subquery(
+        Post.objects.filter(**lookup).order_by('-pub_date')
+        .values('pub_date')[:1])
+
+
+def _upsert(model, pk, changes, defaults):
+    if model.objects.filter(pk=pk).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(pk=pk, **defaults)
+    except IntegrityError:
+        # строку успел создать параллельный запрос
+        _upsert(model, pk, changes, defaults)
+
+
+def _add(model, pk, pub_date):
+    latest = Value(pub_date, output_field=models.DateTimeField())
+    _upsert(model, pk, {
+        'posts_count': F('posts_count') + 1,
+        'last_post_at': Greatest(Coalesce('last_post_at', latest), latest),
+    }, {'posts_count': 1, 'last_post_at': pub_date})
+
+
+def _remove(model, pk, latest):
+    model.objects.filter(pk=pk).update(
+        posts_count=Greatest(F('posts_count') - 1, Value(0)),
+        last_post_at=latest,
+    )
+
+
+def add_post(author_id, group_id, pub_date):
+    _add(AuthorStats, author_id, pub_date)
+    if group_id is not None:
+        _add(GroupStats, group_id, pub_date)
+
+
+def remove_post(author_id, group_id):
+    # вызывается после удаления, так что пост уже не попадёт в подзапрос
+    _remove(AuthorStats, author_id, _latest_pub_date(author_id=author_id))
+    if group_id is not None:
+        _remove(GroupStats, group_id, _latest_pub_date(group_id=group_id))
+
+
+def move_post(previous, owners, pub_date):
+    """Переносит пост между авторами и группами в итогах."""
+    (old_author, old_group), (author, group) = previous, owners
+    if old_author != author:
+        _remove(AuthorStats, old_author,
+                _latest_pub_date(author_id=old_author))
+        _add(AuthorStats, author, pub_date)
+    if old_group != group:
+        if old_group is not None:
+            _remove(GroupStats, old_group,
+                    _latest_pub_date(group_id=old_group))
+        if group is not None:
+            _add(GroupStats, group, pub_date)
+
+
+def add_follower(author_id):
+    _upsert(AuthorStats, author_id,
+            {'followers_count': F('followers_count') + 1},
+            {'followers_count': 1})
+
+
+def remove_follower(author_id):
+    AuthorStats.objects.filter(pk=author_id).update(
+        followers_count=Greatest(F('followers_count') - 1, Value(0)))
+
+
+def author_stats(author):
+    """Итоги автора; без постов — пустые, без сохранения в БД."""
+    try:
+        return author.post_stats
+    except AuthorStats.DoesNotExist:
+        return AuthorStats(author=author)
+
+
+def group_stats(group):
+    try:
+        return group.stats
+    except GroupStats.DoesNotExist:
+        return GroupStats(group=group)
+
+
+def _rebuild(model, owner, *aggregates):
+    rows = defaultdict(dict)
+    for queryset in aggregates:
+        for row in queryset:
+            rows[row.pop(owner)].update(row)
+    model.objects.all().delete()
+    model.objects.bulk_create(
+        model(pk=pk, **values) for pk, values in rows.items())
+    return len(rows)
+
+
+def _post_totals(owner, queryset):
+    return queryset.order_by().values(owner).annotate(
+        posts_count=Count('id'), last_post_at=Max('pub_date'))
+
+
+def rebuild():
+    """Пересчитывает итоги целиком агрегирующими запросами."""
+    with transaction.atomic():
+        authors = _rebuild(
+            AuthorStats, 'author_id',
+            _post_totals('author_id', Post.objects.all()),
+            Follow.objects.filter(author__isnull=False).order_by()
+            .values('author_id').annotate(followers_count=Count('id')),
+        )
+        groups = _rebuild(
+            GroupStats, 'group_id',
+            _post_totals('group_id', Post.objects.filter(
+                group__isnull=False)),
+        )
+    return authors, groups
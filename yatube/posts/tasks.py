@@ -0,0 +1,38 @@
+import json
+
+from django.utils import timezone
+
+from core.tasks import task
+
+from . import images, page_cache, search, timeline
+from .models import Post
+
+
+@task()
+def index_post(post_id):
+    post = Post.objects.only('id', 'text').filter(pk=post_id).first()
+    if post is not None:
+        search.index_post(post)
+
+
+@task()
+def index_imported_posts(first_id, last_id):
+    search.index_posts(Post.objects.filter(pk__range=(first_id, last_id)))
+
+
+@task()
+def fanout_post(post_id):
+    timeline.fanout(post_id)
+
+
+@task()
+def make_thumbnails(post_id):
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    sizes = images.make_thumbnails(post.image)
+    # пока делались копии, картинку могли заменить
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(sizes), updated_at=timezone.now())
+    if updated:
+        page_cache.purge_post(post, group_ids=(post.group_id,))
@@ -0,0 +1,10 @@
+from django import template
+
+from posts.search import highlight as highlight_terms
+
+register = template.Library()
+
+
+@register.filter
+def highlight(text, terms):
+    return highlight_terms(text, terms)
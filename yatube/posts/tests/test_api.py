@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='ApiAuthor', first_name='Артём')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='api-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.user,
+                 group=cls.group if i % 2 else None)
+            for i in range(5)
+        ])
+
+    def test_post_list_sparse_fields(self):
+        """?fields= оставляет в ответе только нужные поля."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('posts:api_post_list'),
+                {'fields': 'text,author', 'limit': 2})
+        data = response.json()
+        self.assertEqual(data['results'], [
+            {'text': 'Пост 4', 'author': 'ApiAuthor'},
+            {'text': 'Пост 3', 'author': 'ApiAuthor'},
+        ])
+        self.assertIsNotNone(data['next'])
+
+    def test_post_list_cursor_paging(self):
+        """Курсор next проходит список без повторов."""
+        url = reverse('posts:api_post_list')
+        params = {'fields': 'id', 'limit': 2}
+        seen = []
+        while True:
+            data = self.client.get(url, params).json()
+            seen.extend(row['id'] for row in data['results'])
+            if not data['next']:
+                break
+            params['after'] = data['next']
+        self.assertEqual(
+            seen, list(Post.objects.values_list('id', flat=True)))
+
+    def test_post_list_filters(self):
+        """Список фильтруется по группе одним запросом."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('posts:api_post_list'),
+                {'group': self.group.slug, 'fields': 'group'})
+        self.assertEqual(response.json()['results'],
+                         [{'group': self.group.slug}] * 2)
+
+    def test_group_list_cursor_paging(self):
+        """Группы отдаются страницами по limit с курсором next."""
+        Group.objects.bulk_create([
+            Group(title=title, slug=f'api-group-{i}')
+            for i, title in enumerate(('Б', 'А', 'Б', 'В|В'))])
+        url = reverse('posts:api_group_list')
+        params = {'fields': 'id', 'limit': 2}
+        seen = []
+        while True:
+            with self.assertNumQueries(1):
+                data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['results']), 2)
+            seen.extend(row['id'] for row in data['results'])
+            if not data['next']:
+                break
+            params['after'] = data['next']
+        self.assertEqual(seen, list(Group.objects.order_by(
+            'title', 'id').values_list('id', flat=True)))
+        response = self.client.get(url, {'after': 'битый'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_item_endpoints(self):
+        """Отдельные ресурсы отдаются одним запросом."""
+        post = Post.objects.first()
+        urls = {
+            reverse('posts:api_post_item', args=[post.pk]): {'id': post.pk},
+            reverse('posts:api_group_item', args=[self.group.slug]): {
+                'id': self.group.pk},
+            reverse('posts:api_author_item', args=[self.user.username]): {
+                'id': self.user.pk},
+            reverse('posts:api_group_list'): {
+                'results': [{'id': self.group.pk}], 'next': None},
+        }
+        for url, expected in urls.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, {'fields': 'id'})
+                self.assertEqual(response.json(), expected)
+
+    def test_errors(self):
+        """Неизвестные поля и ресурсы дают JSON с ошибкой."""
+        response = self.client.get(
+            reverse('posts:api_post_list'), {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        response = self.client.get(
+            reverse('posts:api_author_item', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
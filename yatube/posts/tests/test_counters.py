@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import cache
+from posts import counters
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Counter')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='counter-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+
+    def test_total_follows_post_signals(self):
+        """Общий счётчик меняется при создании и удалении поста."""
+        self.assertEqual(counters.total_count(), 0)
+        post = Post.objects.create(
+            text='Текст', author=self.user, group=self.group)
+        self.assertEqual(counters.total_count(), 1)
+        post.delete()
+        self.assertEqual(counters.total_count(), 0)
+
+    def test_pages_do_not_aggregate_posts(self):
+        """Страницы берут счётчики из кэша и таблиц итогов."""
+        post = Post.objects.create(
+            text='Текст', author=self.user, group=self.group)
+        counters.reconcile()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                for query in queries.captured_queries:
+                    self.assertNotIn('COUNT(', query['sql'])
+                    self.assertNotIn('MAX(', query['sql'])
+
+    def test_recount_command_fixes_stale_counters(self):
+        """posts_recount исправляет счётчики после bulk_create."""
+        counters.total_count()
+        Post.objects.bulk_create(
+            [Post(text='Текст', author=self.user) for _ in range(3)])
+        self.assertEqual(counters.total_count(), 0)
+        call_command('posts_recount', stdout=StringIO())
+        self.assertEqual(counters.total_count(), 3)
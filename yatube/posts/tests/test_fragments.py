@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CardAuthor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='card-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+        self.post = Post.objects.create(
+            text='Исходный текст', author=self.user, group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+
+    def assertPagesContain(self, text):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), text)
+
+    def test_cards_are_cached(self):
+        """Карточка поста берётся из кэша, пока пост не изменён."""
+        self.assertPagesContain('Исходный текст')
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        self.assertPagesContain('Исходный текст')
+
+    def test_post_edit_refreshes_cards(self):
+        """Редактирование поста обновляет его карточки."""
+        self.assertPagesContain('Исходный текст')
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        self.assertPagesContain('Новый текст')
+
+    def test_author_change_refreshes_cards(self):
+        """Смена имени автора сбрасывает его карточки."""
+        self.assertPagesContain('Исходный текст')
+        self.user.first_name = 'Артём'
+        self.user.save()
+        self.assertPagesContain('Автор: Артём')
+
+    def test_cards_follow_owners_without_local_reset(self):
+        """Карточки меняются вместе с автором и группой без сброса кэша.
+
+        Другие процессы сигналов не получают: правка через update()
+        обходит их так же.
+        """
+        # адрес страницы группы меняется вместе со slug
+        index, _, profile = self.urls
+        client = self.authorized_client
+        for url in (index, profile):
+            client.get(url)
+        User.objects.filter(pk=self.user.pk).update(first_name='Артём')
+        Group.objects.filter(pk=self.group.pk).update(slug='new-slug')
+        for url in (index, profile):
+            with self.subTest(url=url):
+                self.assertContains(client.get(url), 'Автор: Артём')
+        self.assertContains(
+            client.get(profile),
+            reverse('posts:group_list', kwargs={'slug': 'new-slug'}))
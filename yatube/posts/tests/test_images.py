@@ -0,0 +1,94 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import cache
+from posts.images import storage
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(width, height=100, color='red', name='picture.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class PostImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Painter')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear_all()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_post(self, image):
+        self.authorized_client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой', 'image': image})
+        return Post.objects.latest('id')
+
+    def test_upload_builds_thumbnails(self):
+        """Воркер делает копии для ширин меньше оригинала."""
+        post = self.create_post(make_image(800))
+        self.assertRegex(post.image.name, r'^posts/[0-9a-f]{32}\.png$')
+        sizes = json.loads(post.thumbnails)
+        self.assertEqual([width for width, _ in sizes], [320, 640, 800])
+        self.assertEqual(sizes[-1][1], post.image.name)
+        for _, name in sizes:
+            self.assertTrue(storage.exists(name))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, f'{storage.url(sizes[0][1])} 320w')
+
+    def test_same_content_stored_once(self):
+        first = self.create_post(make_image(400, name='one.png'))
+        second = self.create_post(make_image(400, name='two.png'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.thumbnails, second.thumbnails)
+
+    def test_concurrent_save_keeps_existing_file(self):
+        """Файл, записанный другим процессом в гонке, не пишется заново."""
+        name = storage.save('posts/race.txt', ContentFile(b'same'))
+        # проверка имени прошла раньше, чем другой процесс записал файл
+        with mock.patch.object(storage, 'exists',
+                               side_effect=[False, True]):
+            self.assertEqual(
+                storage.save(name, ContentFile(b'same')), name)
+        self.assertEqual(storage.listdir('posts')[1].count('race.txt'), 1)
+
+    def test_new_image_replaces_thumbnails(self):
+        post = self.create_post(make_image(400))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Новая картинка', 'image': make_image(400, color='blue')})
+        edited = Post.objects.get(pk=post.pk)
+        self.assertNotEqual(edited.image.name, post.image.name)
+        self.assertIn(edited.image.name, edited.thumbnails)
+
+    def test_text_edit_keeps_thumbnails(self):
+        post = self.create_post(make_image(400))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Только текст'})
+        self.assertEqual(Post.objects.get(pk=post.pk).thumbnails,
+                         post.thumbnails)
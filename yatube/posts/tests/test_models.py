@@ -1,5 +1,8 @@
 from faker import Faker
 from django.contrib.auth import get_user_model
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.conf import settings
 
@@ -35,3 +38,11 @@ class PostModelTest(TestCase):
         for field, expected_value in field_str.items():
             with self.subTest(field=field):
                 self.assertEqual(field, expected_value)
+
+
+class PostIndexesTest(TestCase):
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент обходятся без сканирования и сортировки таблицы."""
+        output = StringIO()
+        call_command('posts_explain', stdout=output)
+        self.assertIn('post_pub_date_id_idx', output.getvalue())
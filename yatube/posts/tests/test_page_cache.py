@@ -0,0 +1,198 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=60)
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='PageAuthor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='page-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+        self.post = Post.objects.create(
+            text='Исходный текст', author=self.user, group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный запрос гостя отдаётся из кэша: из БД читаются только
+        версии тегов, а для страницы поста ещё её автор и группа."""
+        for url, queries in zip(self.urls, (1, 1, 1, 2)):
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertContains(response, 'Исходный текст')
+
+    def test_page_parameter_varies_cache(self):
+        """Страницы с разным ?page= кэшируются отдельно."""
+        url = reverse('posts:index')
+        self.client.get(url)
+        response = self.client.get(url, {'page': 2})
+        self.assertTemplateUsed(response, 'posts/index.html')
+
+    def test_authorized_pages_are_not_cached(self):
+        """Авторизованный пользователь всегда получает свежую страницу."""
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertTemplateUsed(response, 'posts/index.html')
+
+    def test_post_edit_purges_pages(self):
+        """Редактирование поста сбрасывает все страницы с ним."""
+        for url in self.urls:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Новый текст')
+
+    def test_post_create_purges_feeds(self):
+        """Новый пост сразу появляется в лентах."""
+        for url in self.urls[:3]:
+            self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for url in self.urls[:3]:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Свежий пост')
+
+    def test_post_detail_follows_author_and_group(self):
+        """Страница поста обновляется при новом посте автора и правке
+        группы, хотя сам пост не менялся."""
+        url = self.urls[3]
+        self.client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': 'Ещё пост'})
+        self.assertContains(self.client.get(url), '<span >2</span>')
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.client.get(url), 'Новое название')
+
+    def test_author_rename_purges_group_page(self):
+        """Имя автора обновляется и в лентах его групп."""
+        self.client.get(self.urls[1])
+        self.user.first_name = 'Артём'
+        self.user.save()
+        self.assertContains(self.client.get(self.urls[1]), 'Артём')
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='EtagAuthor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='etag-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+        self.post = Post.objects.create(
+            text='Исходный текст', author=self.user, group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        """Совпавший ETag даёт 304, прочитав только версии тегов, а для
+        страницы поста ещё её автора и группу."""
+        for url, queries in zip(self.urls, (1, 1, 1, 2)):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_returns_not_modified(self):
+        """Гость получает 304 по If-Modified-Since."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                last_modified = self.client.get(url)['Last-Modified']
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 304)
+
+    def test_post_edit_changes_etag(self):
+        """После правки поста старый ETag больше не совпадает."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_validators_do_not_depend_on_process_cache(self):
+        """Версии тегов общие для процессов: ETag переживает чужой кэш."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        cache.clear_all()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_post_detail_changes_with_author_and_group(self):
+        """ETag поста меняется при смене имени автора, названия группы и
+        числа постов автора."""
+        url = self.urls[3]
+        changes = (
+            lambda: User.objects.get(pk=self.user.pk).save(),
+            lambda: Group.objects.get(pk=self.group.pk).save(),
+            lambda: Post.objects.create(text='Ещё пост', author=self.user),
+        )
+        for number, change in enumerate(changes, start=1):
+            etag = self.client.get(url)['ETag']
+            last_modified = self.client.get(url)['Last-Modified']
+            # у Last-Modified точность в секунду
+            with mock.patch('posts.page_cache.time') as clock:
+                clock.time.return_value = time.time() + 10 * number
+                change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_for_authorized_user(self):
+        """Гость и авторизованный пользователь получают разные ETag."""
+        url = reverse('posts:index')
+        response = self.authorized_client.get(url)
+        self.assertNotEqual(response['ETag'], self.client.get(url)['ETag'])
+        self.assertFalse(response.has_header('Last-Modified'))
@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase
+
+from posts.paginators import CursorPage, CursorPaginator, FeedPaginator
+
+
+class PageWindowTest(SimpleTestCase):
+    def test_page_window(self):
+        """Окно страниц ограничено и обрамлено многоточиями."""
+        paginator = FeedPaginator(range(1000), 10)
+        windows = {
+            1: [1, 2, 3, None, 100],
+            4: [1, 2, 3, 4, 5, 6, None, 100],
+            50: [1, None, 48, 49, 50, 51, 52, None, 100],
+            100: [1, None, 98, 99, 100],
+        }
+        for number, expected in windows.items():
+            with self.subTest(number=number):
+                self.assertEqual(paginator.page(number).page_window, expected)
+
+    def test_single_page_window(self):
+        """Для одной страницы окно состоит из неё самой."""
+        paginator = FeedPaginator(range(5), 10)
+        self.assertEqual(paginator.page(1).page_window, [1])
+
+
+class CursorPageTest(SimpleTestCase):
+    def test_cursor_page_has_no_numbers(self):
+        """У курсорной страницы нет номеров и COUNT(*), только курсоры."""
+        paginator = CursorPaginator([], 10)
+        page = CursorPage(['a', 'b'], paginator, has_next=True,
+                          has_previous=False)
+        self.assertEqual((len(page), list(page)), (2, ['a', 'b']))
+        self.assertTrue(page.has_other_pages())
+        self.assertFalse(page.numbered)
+        for name in ('number', 'next_page_number', 'start_index'):
+            self.assertFalse(hasattr(page, name))
+        self.assertFalse(hasattr(paginator, 'count'))
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import cache
+from core.testing import QueryBudgetTestMixin
+from posts import stats, views
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class QueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='BudgetAuthor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='budget-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(15)
+        ])
+        stats.rebuild()
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        cache.clear_all()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_within_budget(self):
+        """Страницы укладываются в бюджет запросов при холодном кэше."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_search') + '?q=пост',
+            reverse('posts:follow_index'),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            for client in (self.client, self.authorized_client):
+                with self.subTest(url=url, client=client):
+                    cache.clear_all()
+                    self.assertWithinQueryBudget(url, client)
+
+    def test_writes_within_budget(self):
+        """Создание и правка поста укладываются в бюджет запросов."""
+        form_data = {'text': 'Текст', 'group': self.group.pk}
+        urls = (
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(
+                    url, self.authorized_client, method='post',
+                    data=form_data)
+
+    def test_first_writes_within_budget(self):
+        """Первый пост автора в новую группу и его перенос в другую новую
+        группу создают строки итогов и тоже укладываются в бюджет."""
+        client = Client()
+        client.force_login(User.objects.create_user(username='Newcomer'))
+        groups = [
+            Group.objects.create(title=f'Новая {number}',
+                                 slug=f'new-{number}')
+            for number in range(2)
+        ]
+        self.assertWithinQueryBudget(
+            reverse('posts:post_create'), client, method='post',
+            data={'text': 'Первый пост', 'group': groups[0].pk})
+        post = Post.objects.get(author__username='Newcomer')
+        self.assertWithinQueryBudget(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}), client,
+            method='post', data={'text': 'Правка', 'group': groups[1].pk})
+
+    def test_exceeded_budget_is_logged(self):
+        """Превышение бюджета пишется в лог core.query_budget."""
+        with mock.patch.object(views.index, 'query_budget', 0), \
+                self.assertLogs('core.query_budget', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertIn('Бюджет запросов превышен: /', logs.output[0])
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        """В режиме отладки статистика запросов видна в заголовках."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response['X-DB-Query-Budget'], '5')
+        self.assertLessEqual(int(response['X-DB-Queries']), 5)
+        self.assertIn('X-DB-Time-Ms', response)
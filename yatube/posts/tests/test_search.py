@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import Worker
+from posts.models import Post, PostTerm
+
+User = get_user_model()
+
+
+@override_settings(TASKS_EAGER=True)
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Searcher')
+        cls.cats = Post.objects.create(
+            text='Кошки любят рыбу. Кошки спят.', author=cls.user)
+        cls.cat = Post.objects.create(
+            text='Кошки и собаки', author=cls.user)
+        cls.dog = Post.objects.create(
+            text='Собака <лает>', author=cls.user)
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:post_search'), {'q': query})
+        return response, list(response.context['page_obj'])
+
+    def test_search_ranks_matching_posts(self):
+        """Найдены только посты со всеми словами, чаще — выше."""
+        _, posts = self.search('КОШКИ')
+        self.assertEqual(posts, [self.cats, self.cat])
+        _, posts = self.search('кошки собаки')
+        self.assertEqual(posts, [self.cat])
+
+    def test_search_highlights_terms(self):
+        """Слова запроса выделены, а текст экранирован."""
+        response, _ = self.search('собака')
+        self.assertContains(response, '<mark>Собака</mark> &lt;лает&gt;')
+
+    def test_edit_updates_index(self):
+        """Правка поста переиндексирует его."""
+        self.dog.text = 'Попугай'
+        self.dog.save()
+        self.assertEqual(self.search('собака')[1], [])
+        self.assertEqual(self.search('попугай')[1], [self.dog])
+
+    @override_settings(TASKS_EAGER=False)
+    def test_index_is_built_by_worker(self):
+        """Индекс нового поста строит воркер очереди задач."""
+        post = Post.objects.create(text='Хомяк', author=self.user)
+        self.assertEqual(self.search('хомяк')[1], [])
+        Worker().run_pending()
+        self.assertEqual(self.search('хомяк')[1], [post])
+
+    def test_reindex_command(self):
+        """posts_reindex восстанавливает индекс."""
+        PostTerm.objects.all().delete()
+        call_command('posts_reindex', batch_size=2, stdout=StringIO())
+        self.assertEqual(self.search('кошки')[1], [self.cats, self.cat])
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через тот же индекс."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@mail.ru', password='pass')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собаки'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.cat])
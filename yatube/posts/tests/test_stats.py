@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import cache
+from posts import stats
+from posts.models import AuthorStats, Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class PostStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='StatsAuthor')
+        cls.other_user = User.objects.create_user(username='OtherAuthor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='stats-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-stats-slug',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+
+    def assertStats(self, owner, posts_count, last_post_at):
+        owner.refresh_from_db()
+        if isinstance(owner, Group):
+            current = stats.group_stats(owner)
+        else:
+            current = stats.author_stats(owner)
+        self.assertEqual(current.posts_count, posts_count)
+        self.assertEqual(current.last_post_at, last_post_at)
+
+    def test_stats_follow_post_lifecycle(self):
+        """Итоги меняются при создании, переносе и удалении поста."""
+        first = Post.objects.create(
+            text='Первый', author=self.user, group=self.group)
+        second = Post.objects.create(
+            text='Второй', author=self.user, group=self.group)
+        self.assertStats(self.user, 2, second.pub_date)
+        self.assertStats(self.group, 2, second.pub_date)
+
+        second.group = self.other_group
+        second.author = self.other_user
+        second.save()
+        self.assertStats(self.group, 1, first.pub_date)
+        self.assertStats(self.other_group, 1, second.pub_date)
+        self.assertStats(self.user, 1, first.pub_date)
+        self.assertStats(self.other_user, 1, second.pub_date)
+
+        Post.objects.filter(pk=first.pk).delete()
+        self.assertStats(self.user, 0, None)
+        self.assertStats(self.group, 0, None)
+
+    def test_post_create_view_updates_stats(self):
+        """Создание поста через форму увеличивает итоги автора и группы."""
+        client = self.client_class()
+        client.force_login(self.user)
+        client.post(reverse('posts:post_create'),
+                    {'text': 'Текст', 'group': self.group.pk})
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 1)
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 1)
+
+    def test_pages_show_stats(self):
+        """Профиль и группа показывают число постов из итогов."""
+        Post.objects.create(text='Текст', author=self.user, group=self.group)
+        urls = (
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.context['stats'].posts_count, 1)
+
+    def test_recount_rebuilds_stats(self):
+        """posts_recount пересчитывает итоги после bulk_create."""
+        pub_date = timezone.now() - timedelta(days=1)
+        Post.objects.create(text='Текст', author=self.user)
+        Post.objects.bulk_create([
+            Post(text='Текст', author=self.user, group=self.group)
+            for _ in range(3)
+        ])
+        Post.objects.filter(group=self.group).update(pub_date=pub_date)
+        AuthorStats.objects.create(author=self.other_user, posts_count=5)
+        call_command('posts_recount', stdout=StringIO())
+        self.assertStats(self.user, 4,
+                         Post.objects.filter(group=None).get().pub_date)
+        self.assertStats(self.group, 3, pub_date)
+        self.assertStats(self.other_user, 0, None)
+
+
+class StatsMigrationTest(TransactionTestCase):
+    before = [('posts', '0006_post_term')]
+    after = [('posts', '0007_post_stats')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_migration_fills_stats_for_existing_posts(self):
+        """Миграция считает итоги по постам, опубликованным до неё."""
+        apps = self.migrate(self.before)
+        author = apps.get_model('auth', 'User').objects.create(
+            username='OldAuthor')
+        group = apps.get_model('posts', 'Group').objects.create(
+            title='Группа', slug='old-slug')
+        OldPost = apps.get_model('posts', 'Post')
+        OldPost.objects.create(text='Первый', author=author)
+        last = OldPost.objects.create(text='Второй', author=author,
+                                      group=group)
+        apps = self.migrate(self.after)
+        author_stats = apps.get_model('posts', 'AuthorStats').objects.get(
+            author_id=author.pk)
+        self.assertEqual(author_stats.posts_count, 2)
+        self.assertEqual(author_stats.last_post_at, last.pub_date)
+        group_stats = apps.get_model('posts', 'GroupStats').objects.get(
+            group_id=group.pk)
+        self.assertEqual(group_stats.posts_count, 1)
@@ -0,0 +1,136 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import cache
+from posts import stats, timeline
+from posts.models import Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(TASKS_EAGER=True)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Writer')
+        cls.stranger = User.objects.create_user(username='Stranger')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='timeline-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear_all()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def timeline_ids(self, user=None, **params):
+        client = self.reader_client
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+        response = client.get(reverse('posts:follow_index'), params)
+        return [post.pk for post in response.context['page_obj']]
+
+    def test_new_posts_fan_out_to_followers(self):
+        """Пост автора и пост в группе попадают в ленту подписчика."""
+        self.reader_client.post(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}))
+        self.reader_client.post(reverse(
+            'posts:group_follow', kwargs={'slug': self.group.slug}))
+        by_author = Post.objects.create(text='Автор', author=self.author)
+        in_group = Post.objects.create(
+            text='Группа', author=self.stranger, group=self.group)
+        Post.objects.create(text='Чужой', author=self.stranger)
+        self.assertEqual(self.timeline_ids(), [in_group.pk, by_author.pk])
+        self.assertEqual(self.timeline_ids(self.author), [by_author.pk])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка переносит старые посты, отписка убирает их."""
+        post = Post.objects.create(text='Старый', author=self.author)
+        in_group = Post.objects.create(
+            text='В группе', author=self.author, group=self.group)
+        timeline.follow(self.reader, author=self.author)
+        timeline.follow(self.reader, group=self.group)
+        self.assertEqual(self.timeline_ids(), [in_group.pk, post.pk])
+        self.assertEqual(
+            stats.author_stats(self.author).followers_count, 1)
+
+        timeline.unfollow(self.reader, author=self.author)
+        self.assertEqual(self.timeline_ids(), [in_group.pk])
+        self.author.refresh_from_db()
+        self.assertEqual(
+            stats.author_stats(self.author).followers_count, 0)
+
+    def test_group_change_moves_post_between_timelines(self):
+        """Пост уходит из лент прежней группы и приходит в ленты новой."""
+        other = Group.objects.create(title='Другая', slug='timeline-other')
+        timeline.follow(self.reader, group=self.group)
+        timeline.follow(self.stranger, group=other)
+        post = Post.objects.create(
+            text='Переезд', author=self.author, group=self.group)
+        self.assertEqual(self.timeline_ids(), [post.pk])
+
+        author_client = Client()
+        author_client.force_login(self.author)
+        author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Переезд', 'group': other.pk})
+        self.assertEqual(self.timeline_ids(), [])
+        self.assertEqual(self.timeline_ids(self.stranger), [post.pk])
+        self.assertEqual(self.timeline_ids(self.author), [post.pk])
+
+    def test_cannot_follow_self(self):
+        """Подписаться на самого себя нельзя."""
+        self.reader_client.post(reverse(
+            'posts:profile_follow', kwargs={'username': self.reader}))
+        self.assertFalse(Follow.objects.exists())
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_is_merged_on_read(self):
+        """Посты популярного автора читаются без рассылки по лентам."""
+        timeline.follow(self.reader, author=self.author)
+        timeline.follow(self.reader, group=self.group)
+        popular = [Post.objects.create(text=f'Пост {i}', author=self.author)
+                   for i in range(8)]
+        in_group = [Post.objects.create(
+            text=f'Группа {i}', author=self.stranger, group=self.group)
+            for i in range(8)]
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader, post__author=self.author).exists())
+        expected = sorted(popular + in_group,
+                          key=lambda post: (post.pub_date, post.pk),
+                          reverse=True)
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        page_obj = response.context['page_obj']
+        seen = [post.pk for post in page_obj]
+        while page_obj.has_next():
+            response = self.reader_client.get(
+                reverse('posts:follow_index'),
+                {'after': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            seen.extend(post.pk for post in page_obj)
+        self.assertEqual(seen, [post.pk for post in expected])
+
+        response = self.reader_client.get(
+            reverse('posts:follow_index'),
+            {'before': page_obj.previous_cursor})
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in expected[:10]])
+
+    def test_fanout_command_fills_timelines(self):
+        """posts_fanout раскладывает посты, созданные в обход сигналов."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.bulk_create([Post(text='Текст', author=self.author)])
+        self.assertEqual(self.timeline_ids(), [])
+        call_command('posts_fanout', stdout=StringIO())
+        self.assertEqual(self.timeline_ids(),
+                         list(Post.objects.values_list('id', flat=True)))
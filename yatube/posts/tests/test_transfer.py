@@ -0,0 +1,96 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from core.models import Task
+from posts import search
+from posts.models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class PostTransferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Exporter')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='transfer-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(text='С группой', author=cls.user,
+                            group=cls.group)
+        Post.objects.create(text='Без группы,\nс "кавычками"',
+                            author=cls.user)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def snapshot(self):
+        return list(Post.objects.order_by('id').values_list(
+            'text', 'pub_date', 'author', 'group'))
+
+    def test_export_import_round_trip(self):
+        """Выгруженные посты загружаются обратно без потерь."""
+        expected = self.snapshot()
+        for fmt in ('jsonl', 'csv'):
+            with self.subTest(fmt=fmt):
+                path = os.path.join(self.tmp_dir.name, f'posts.{fmt}')
+                call_command('posts_export', path, stderr=StringIO())
+                Post.objects.all().delete()
+                call_command('posts_import', path, batch_size=1,
+                             stdout=StringIO())
+                self.assertEqual(self.snapshot(), expected)
+
+    def test_import_skips_unknown_author_and_group(self):
+        """Строки с неизвестным автором или группой пропускаются."""
+        path = os.path.join(self.tmp_dir.name, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write('{"text": "1", "author": "nobody"}\n'
+                         '{"text": "2", "author": "Exporter", '
+                         '"group": "missing"}\n'
+                         '{"text": "3", "author": "Exporter"}\n')
+        output = StringIO()
+        call_command('posts_import', path, stdout=output)
+        self.assertIn('Загружено: 1, пропущено: 2', output.getvalue())
+        self.assertTrue(Post.objects.filter(text='3').exists())
+
+    def write_rows(self, *lines):
+        path = os.path.join(self.tmp_dir.name, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(''.join(line + '\n' for line in lines))
+        return path
+
+    @override_settings(TASKS_EAGER=True)
+    def test_imported_posts_are_searchable(self):
+        """Загруженные пачки индексируются без --reindex."""
+        path = self.write_rows(
+            '{"text": "Редкое слово", "author": "Exporter"}',
+            '{"text": "Другое редкое", "author": "Exporter"}')
+        call_command('posts_import', path, batch_size=1, stdout=StringIO())
+        found = search.search_posts(search.query_terms('редкое'))
+        self.assertEqual(sorted(post.text for post in found),
+                         ['Другое редкое', 'Редкое слово'])
+
+    def test_failed_import_refreshes_saved_batches(self):
+        """Итоги пересчитываются и для пачек, сохранённых до ошибки."""
+        path = self.write_rows(
+            '{"text": "1", "author": "Exporter", "group": "transfer-slug"}',
+            '{"text": "2", "author": "Exporter", "pub_date": "вчера"}')
+        with self.assertRaises(CommandError):
+            call_command('posts_import', path, batch_size=1,
+                         stdout=StringIO())
+        self.assertTrue(Post.objects.filter(text='1').exists())
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 2)
+        self.assertEqual(
+            Task.objects.filter(name='posts.tasks.index_imported_posts')
+            .count(), 1)
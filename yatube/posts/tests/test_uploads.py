@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.images import storage
+from posts.models import Post
+from posts.tests.test_images import make_image
+from posts.uploads import UPLOAD_TMP_DIR
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def leftover_uploads():
+    directory = storage.path(UPLOAD_TMP_DIR)
+    return os.listdir(directory) if os.path.exists(directory) else []
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class ImageUploadHandlerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Uploader')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def upload(self, image):
+        return self.authorized_client.post(reverse('posts:post_create'), {
+            'text': 'Пост с файлом', 'image': image})
+
+    def assertRejected(self, image, error):
+        response = self.upload(image)
+        self.assertFormError(response, 'form', 'image', error)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(leftover_uploads(), [])
+
+    def test_upload_is_moved_into_storage(self):
+        """Принятый файл переносится в хранилище, временных не остаётся."""
+        self.upload(make_image(200))
+        post = Post.objects.get()
+        self.assertTrue(storage.exists(post.image.name))
+        self.assertEqual(leftover_uploads(), [])
+
+    def test_extension_follows_content(self):
+        image = make_image(200, name='picture.gif')
+        image.content_type = 'image/gif'
+        self.upload(image)
+        self.assertTrue(Post.objects.get().image.name.endswith('.png'))
+
+    @override_settings(POSTS_IMAGE_MAX_SIZE=100)
+    def test_large_file_rejected(self):
+        self.assertRejected(make_image(200), 'Картинка больше 100\xa0байт.')
+
+    def test_unknown_type_rejected(self):
+        self.assertRejected(
+            SimpleUploadedFile('doc.pdf', b'%PDF-1.4',
+                               content_type='application/pdf'),
+            'Загрузите картинку: JPEG, PNG, GIF или WebP.')
+
+    def test_content_not_matching_type_rejected(self):
+        self.assertRejected(
+            SimpleUploadedFile('fake.png', b'<html></html>',
+                               content_type='image/png'),
+            'Файл не похож на картинку.')
+
+    def test_csrf_still_checked(self):
+        """Картинки принимаются только вместе с проверкой CSRF."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'), {
+            'text': 'Пост с файлом', 'image': make_image(200)})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(leftover_uploads(), [])
@@ -6,6 +6,8 @@ from django.urls import reverse
 from django import forms
 from django.conf import settings
 
+from core import cache
+from posts import stats
 from posts.models import Group, Post
 
 fake = Faker()
@@ -119,6 +121,7 @@ class PaginatorViewsTest(TestCase):
             ])
 
     def setUp(self):
+        cache.clear_all()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -145,3 +148,66 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(
                     len(response_two_page.context['page_obj']),
                     count_post_two_page)
+
+
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CursorUser')
+        cls.group = Group.objects.create(
+            title='Группа для курсоров',
+            slug='cursor-slug',
+            description='Тестовое описание')
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(settings.POSTS_CHIK * 2 + 5)
+        ])
+        # одинаковая дата у всех постов: порядок держится только на id
+        Post.objects.update(pub_date=Post.objects.first().pub_date)
+        # bulk_create обходит сигналы, итоги пересчитываем явно
+        stats.rebuild()
+
+    def setUp(self):
+        cache.clear_all()
+
+    def test_cursor_pages_cover_feed(self):
+        """Курсоры ?after= проходят всю ленту без пропусков и повторов."""
+        expected = list(Post.objects.values_list('id', flat=True))
+        urls = {
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        }
+        for url in urls:
+            with self.subTest(url=url):
+                seen = []
+                page_obj = self.client.get(url).context['page_obj']
+                seen.extend(post.id for post in page_obj)
+                while page_obj.has_next():
+                    response = self.client.get(
+                        url, {'after': page_obj.next_cursor})
+                    page_obj = response.context['page_obj']
+                    self.assertTrue(page_obj.has_previous())
+                    seen.extend(post.id for post in page_obj)
+                self.assertEqual(seen, expected)
+
+    def test_cursor_before_returns_previous_page(self):
+        """?before= возвращает предыдущую страницу."""
+        url = reverse('posts:index')
+        first_page = self.client.get(url).context['page_obj']
+        second_page = self.client.get(
+            url, {'after': first_page.next_cursor}).context['page_obj']
+        response = self.client.get(
+            url, {'before': second_page.previous_cursor})
+        self.assertEqual(list(response.context['page_obj']),
+                         list(first_page))
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдаёт первую страницу."""
+        response = self.client.get(reverse('posts:index'),
+                                   {'after': 'broken'})
+        self.assertEqual(len(response.context['page_obj']),
+                         settings.POSTS_CHIK)
+        self.assertFalse(response.context['page_obj'].has_previous())
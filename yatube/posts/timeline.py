@@ -0,0 +1,157 @@
+import heapq
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import CursorPaginator, slice_after
+
+FANOUT_BATCH_SIZE = 1000
+BACKFILL_SIZE = 100
+
+
+def is_popular(author_id):
+    """Подписчиков так много, что посты автора читаются без рассылки."""
+    return AuthorStats.objects.filter(
+        pk=author_id,
+        followers_count__gte=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def deliver(post_id, pub_date, user_ids):
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def prune(post_id, author_id, group_id):
+    """Убирает пост из лент, куда он больше не должен попадать."""
+    sources = Q(author_id=author_id)
+    if group_id is not None:
+        sources |= Q(group_id=group_id)
+    TimelineEntry.objects.filter(post_id=post_id).exclude(
+        user_id=author_id).exclude(
+        user_id__in=Follow.objects.filter(sources).values('user_id'),
+    ).delete()
+
+
+def fanout(post_id):
+    """Раскладывает пост по лентам подписчиков пачками.
+
+    Повторный вызов после смены группы поста убирает его из лент
+    подписчиков прежней группы и добавляет подписчикам новой.
+    """
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'group_id', 'pub_date').first()
+    if post is None:
+        return
+    prune(post_id, post['author_id'], post['group_id'])
+    deliver(post_id, post['pub_date'], [post['author_id']])
+    sources = []
+    if post['group_id'] is not None:
+        sources.append(Follow.objects.filter(group_id=post['group_id']))
+    if not is_popular(post['author_id']):
+        sources.append(Follow.objects.filter(author_id=post['author_id']))
+    # каждая пачка — диапазон по уникальному ключу (источник, user),
+    # совпадения из двух источников отбрасывает ignore_conflicts
+    for followers in sources:
+        last_user_id = 0
+        while True:
+            user_ids = list(
+                followers.filter(user_id__gt=last_user_id)
+                .order_by('user_id')
+                .values_list('user_id', flat=True)[:FANOUT_BATCH_SIZE])
+            if not user_ids:
+                break
+            deliver(post_id, post['pub_date'], user_ids)
+            last_user_id = user_ids[-1]
+
+
+def _source_posts(author=None, group=None):
+    if author is not None:
+        return Post.objects.filter(author=author)
+    return Post.objects.filter(group=group)
+
+
+def follow(user, author=None, group=None):
+    """Подписывает и переносит в ленту последние посты источника."""
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(
+            user=user, author=author, group=group)
+        if not created or (author is not None and is_popular(author.pk)):
+            return created
+        posts = _source_posts(author, group).values_list(
+            'id', 'pub_date')[:BACKFILL_SIZE]
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+             for post_id, pub_date in posts],
+            ignore_conflicts=True,
+        )
+    return created
+
+
+def unfollow(user, author=None, group=None):
+    """Отписывает и убирает из ленты посты, пришедшие только оттуда."""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            user=user, author=author, group=group).delete()
+        if not deleted:
+            return False
+        entries = TimelineEntry.objects.filter(user=user)
+        if author is not None:
+            entries = entries.filter(post__author=author).exclude(
+                post__group__followers__user=user)
+        else:
+            entries = entries.filter(post__group=group).exclude(
+                post__author__followers__user=user).exclude(
+                post__author=user)
+        entries.delete()
+    return True
+
+
+def is_following(user, author=None, group=None):
+    if not user.is_authenticated:
+        return False
+    return Follow.objects.filter(
+        user=user, author=author, group=group).exists()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок: разосланные записи плюс посты популярных авторов.
+
+    Записи ленты читаются диапазоном по индексу (user, pub_date, post).
+    Посты авторов, чьи подписчики не получают рассылку, добираются вторым
+    диапазоном по индексу (author, pub_date) и сливаются с первыми.
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(TimelineEntry.objects.filter(user=user), per_page)
+        self.user = user
+
+    def fetch(self, position, older):
+        limit = self.per_page + 1
+        entries = slice_after(
+            self.object_list.select_related('post__author', 'post__group'),
+            position, older, limit, pk_field='post_id')
+        popular = slice_after(
+            Post.objects.select_related('author', 'group').filter(
+                author__followers__user=self.user,
+                author__post_stats__followers_count__gte=(
+                    settings.POSTS_TIMELINE_FANOUT_LIMIT),
+            ),
+            position, older, limit)
+        merged = heapq.merge(
+            (entry.post for entry in entries), popular,
+            key=lambda post: (post.pub_date, post.pk), reverse=older)
+        rows = []
+        seen = set()
+        for post in merged:
+            if post.pk not in seen:
+                seen.add(post.pk)
+                rows.append(post)
+            if len(rows) == limit:
+                break
+        return rows
@@ -0,0 +1,57 @@
+import csv
+import json
+from contextlib import contextmanager
+
+from .models import Post
+
+FIELDS = ('text', 'pub_date', 'author', 'group')
+FORMATS = ('jsonl', 'csv')
+
+
+def guess_format(path, default='jsonl'):
+    for fmt in FORMATS:
+        if path.endswith(f'.{fmt}'):
+            return fmt
+    return default
+
+
+def read_rows(stream, fmt):
+    """Построчно читает записи постов, не загружая файл целиком."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RowWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.writer(stream)
+            self.writer.writerow(FIELDS)
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            self.writer.writerow(row)
+        else:
+            self.stream.write(
+                json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+            self.stream.write('\n')
+
+
+@contextmanager
+def keep_post_dates():
+    """Не даёт auto_now/auto_now_add перезаписать даты из файла."""
+    fields = [Post._meta.get_field(name)
+              for name in ('pub_date', 'updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
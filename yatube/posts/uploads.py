@@ -0,0 +1,153 @@
+"""Потоковый приём картинок постов.
+
+ImageUploadHandler проверяет тип и размер файла, пока он приходит, и
+сразу пишет его во временный файл рядом с хранилищем картинок, считая
+хэш. Сохранение поста тогда только переименовывает готовый файл. Всё,
+что не прошло проверку, дальше не пишется, а в форму вместо файла
+попадает RejectedUpload с причиной отказа.
+
+Обработчик ставится только представлениям постов декоратором
+accept_images, остальные загрузки (например, в админке) идут через
+обработчики Django по умолчанию.
+"""
+import hashlib
+import os
+import tempfile
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .images import UPLOAD_DIR, storage
+
+UPLOAD_TMP_DIR = 'tmp'
+
+# тип из заголовка части, сигнатура начала файла, расширение
+IMAGE_TYPES = {
+    'image/jpeg': (b'\xff\xd8\xff', '.jpg'),
+    'image/png': (b'\x89PNG\r\n\x1a\n', '.png'),
+    'image/gif': (b'GIF8', '.gif'),
+    'image/webp': (b'RIFF', '.webp'),
+}
+
+
+def sniff_extension(head):
+    """Расширение по первым байтам файла или None, если это не картинка."""
+    for signature, extension in IMAGE_TYPES.values():
+        if head.startswith(signature):
+            if extension == '.webp' and head[8:12] != b'WEBP':
+                continue
+            return extension
+    return None
+
+
+class HashedUpload(UploadedFile):
+    """Загруженный файл на том же диске, что и хранилище картинок."""
+
+    def __init__(self, name, content_type, charset, content_type_extra):
+        directory = storage.path(UPLOAD_TMP_DIR)
+        os.makedirs(directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload', dir=directory)
+        super().__init__(file, name, content_type, 0, charset,
+                         content_type_extra)
+        self.sha256 = hashlib.sha256()
+        self.extension = None
+
+    @property
+    def stored_name(self):
+        return f'{UPLOAD_DIR}/{self.sha256.hexdigest()[:32]}{self.extension}'
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # файл уже перенесён в хранилище
+            pass
+
+
+class RejectedUpload(UploadedFile):
+    def __init__(self, name, error):
+        super().__init__(None, name, size=0)
+        self.error = error
+
+
+class ImageUploadHandler(FileUploadHandler):
+    request_size = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        self.request_size = content_length
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.upload = None
+        self.error = None
+        limit = settings.POSTS_IMAGE_MAX_SIZE
+        # поля формы не больше DATA_UPLOAD_MAX_MEMORY_SIZE, остальное — файл
+        fields_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        if self.content_type not in IMAGE_TYPES:
+            self.error = 'Загрузите картинку: JPEG, PNG, GIF или WebP.'
+        elif (self.content_length or 0) > limit or (
+                self.request_size > limit + fields_size):
+            self.reject_size()
+        else:
+            self.upload = HashedUpload(
+                self.file_name, self.content_type, self.charset,
+                self.content_type_extra)
+
+    def reject_size(self):
+        self.error = (f'Картинка больше '
+                      f'{filesizeformat(settings.POSTS_IMAGE_MAX_SIZE)}.')
+
+    def reject(self):
+        self.upload.close()
+        self.upload = None
+
+    def receive_data_chunk(self, raw_data, start):
+        # после отказа остаток файла читается из запроса, но не пишется
+        if self.upload is None:
+            return None
+        if start == 0:
+            self.upload.extension = sniff_extension(raw_data)
+            if self.upload.extension is None:
+                self.error = 'Файл не похож на картинку.'
+                self.reject()
+                return None
+        if start + len(raw_data) > settings.POSTS_IMAGE_MAX_SIZE:
+            self.reject_size()
+            self.reject()
+            return None
+        self.upload.write(raw_data)
+        self.upload.sha256.update(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.upload is None:
+            return RejectedUpload(self.file_name, self.error)
+        self.upload.file.flush()
+        self.upload.file.seek(0)
+        self.upload.size = file_size
+        return self.upload
+
+
+def accept_images(view):
+    """Принимает файлы запроса через ImageUploadHandler.
+
+    Обработчики можно менять только до чтения request.POST, а
+    CsrfViewMiddleware читает его раньше представления, поэтому проверка
+    CSRF переносится внутрь.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, ImageUploadHandler(request))
+        return protected(request, *args, **kwargs)
+    return wrapper
@@ -1,62 +1,171 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.views.decorators.http import require_POST
+from django.utils.http import urlencode
 
+from core.query_budget import query_budget
+
+from . import counters, search, stats, timeline
 from .forms import PostForm
 from .models import Post, Group, User
+from .page_cache import (AUTHOR_TAG, FEED_TAG, GROUP_TAG, POST_TAG,
+                         cache_anonymous_page, conditional_page,
+                         post_owner_tags)
+from .paginators import CursorPaginator, FeedPaginator
+from .uploads import accept_images
 
 COUNT_POSTS = 10
 
 
-def get_paginator_obj(request, posts):
-    paginator = Paginator(posts, COUNT_POSTS)
+def get_paginator_obj(request, posts, count=None):
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        paginator = CursorPaginator(posts, COUNT_POSTS)
+        return paginator.get_cursor_page(after=after, before=before)
+    paginator = FeedPaginator(posts, COUNT_POSTS, count=count)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
+@query_budget(5)
+@conditional_page(FEED_TAG)
+@cache_anonymous_page(FEED_TAG)
 def index(request):
     post_list = Post.objects.select_related('author', 'group')
-    page_obj = get_paginator_obj(request, post_list)
+    page_obj = get_paginator_obj(request, post_list,
+                                 count=counters.total_count())
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(6)
+@conditional_page(GROUP_TAG)
+@cache_anonymous_page(GROUP_TAG)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_object_or_404(
+        Group.objects.select_related('stats'), slug=slug)
+    group_stats = stats.group_stats(group)
     posts = group.posts.select_related('author')
-    page_obj = get_paginator_obj(request, posts)
+    page_obj = get_paginator_obj(request, posts,
+                                 count=group_stats.posts_count)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'stats': group_stats,
+        'following': timeline.is_following(request.user, group=group),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@query_budget(6)
+@conditional_page(AUTHOR_TAG)
+@cache_anonymous_page(AUTHOR_TAG)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    user_posts = Post.objects.select_related().filter(author=author).all()
-    page_obj = get_paginator_obj(request, user_posts)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username)
+    author_stats = stats.author_stats(author)
+    user_posts = Post.objects.select_related('author', 'group').filter(
+        author=author)
+    page_obj = get_paginator_obj(request, user_posts,
+                                 count=author_stats.posts_count)
     context = {
         'author': author,
         'page_obj': page_obj,
+        'posts_count': author_stats.posts_count,
+        'stats': author_stats,
+        'following': timeline.is_following(request.user, author=author),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@query_budget(4)
+@login_required
+def follow_index(request):
+    paginator = timeline.TimelinePaginator(request.user, COUNT_POSTS)
+    page_obj = paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@require_POST
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        timeline.follow(request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@require_POST
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    timeline.unfollow(request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@require_POST
+@login_required
+def group_follow(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    timeline.follow(request.user, group=group)
+    return redirect('posts:group_list', slug)
+
+
+@require_POST
+@login_required
+def group_unfollow(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    timeline.unfollow(request.user, group=group)
+    return redirect('posts:group_list', slug)
+
+
+@query_budget(5)
+@conditional_page(POST_TAG, post_owner_tags)
+@cache_anonymous_page(POST_TAG, post_owner_tags)
 def post_detail(request, post_id):
-    user_post = get_object_or_404(Post, id=post_id)
+    user_post = get_object_or_404(
+        Post.objects.select_related('author__post_stats', 'group'),
+        id=post_id)
     context = {
         'user_post': user_post,
+        'posts_count': stats.author_stats(user_post.author).posts_count,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(5)
+def post_search(request):
+    query = request.GET.get('q', '')
+    terms = search.query_terms(query)
+    posts = search.search_posts(terms, Post.objects.select_related('author'))
+    paginator = FeedPaginator(posts, COUNT_POSTS, cursors=False)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'terms': terms,
+        'page_obj': page_obj,
+        'query_prefix': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+# худший случай — первый пост автора в группу с картинкой: строки итогов
+# создаются в точках сохранения, а картинка добавляет задачу воркеру
+@query_budget(20)
 @login_required
+@accept_images
+@transaction.atomic
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         create_post = form.save(commit=False)
         create_post.author = request.user
@@ -71,12 +180,19 @@ def post_create(request):
     return render(request, 'posts/create_post.html', context)
 
 
+# перенос поста в новую группу создаёт её итоги и заново раскладывает
+# пост по лентам подписчиков
+@query_budget(18)
 @login_required
+@accept_images
+@transaction.atomic
 def post_edit(request, post_id):
-    select_post = get_object_or_404(Post, id=post_id)
-    if request.user != select_post.author:
+    select_post = get_object_or_404(
+        Post.objects.select_related('author'), id=post_id)
+    if request.user.pk != select_post.author_id:
         return redirect('posts:post_detail', post_id)
-    form = PostForm(request.POST or None, instance=select_post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=select_post)
     if form.is_valid():
         form.save()
         return redirect('posts:post_detail', post_id)
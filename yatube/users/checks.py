@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.checks import Error, register
+
+# модуль хэшера → пакет в PyPI
+PACKAGES = {'argon2': 'argon2-cffi'}
+
+
+@register()
+def check_password_hasher(app_configs, **kwargs):
+    hasher = get_hasher()
+    if not hasher.library:
+        return []
+    try:
+        hasher._load_library()
+    except ValueError:
+        library = hasher.library
+        module = library[0] if isinstance(library, tuple) else library
+        return [Error(
+            f'Профиль паролей {settings.PASSWORD_HASHER_PROFILE!r} требует '
+            f'модуль {module}',
+            hint=f'pip install {PACKAGES.get(module, module)}',
+            id='users.E001',
+        )]
+    return []
@@ -0,0 +1,15 @@
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id-параметры для входа на веб-воркере: 19 МиБ, два прохода.
+
+    Хэши с другими параметрами пересчитываются при следующем входе.
+    """
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    rounds = 10
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+PBKDF2 = settings.PASSWORD_HASHER_PROFILES['pbkdf2']
+
+
+class PasswordHasherProfileTest(TestCase):
+    def login(self, password='secret-password'):
+        return self.client.post(reverse('users:login'), {
+            'username': 'hasher', 'password': password})
+
+    def test_tests_use_fast_hasher(self):
+        """Тесты хэшируют пароли MD5, но в настройках его профиля нет."""
+        self.assertEqual(settings.PASSWORD_HASHERS[1:],
+                         settings.PASSWORD_HASHER_PROFILES['pbkdf2'])
+        self.assertFalse(any(
+            'MD5' in hasher
+            for profile in settings.PASSWORD_HASHER_PROFILES.values()
+            for hasher in profile))
+        user = User.objects.create_user('fast', password='secret-password')
+        self.assertEqual(identify_hasher(user.password).algorithm, 'md5')
+
+    def test_login_rehashes_with_preferred_hasher(self):
+        """При входе пароль пересчитывается первым хэшером профиля."""
+        with override_settings(PASSWORD_HASHERS=PBKDF2):
+            user = User.objects.create_user(
+                'hasher', password='secret-password')
+        self.assertEqual(identify_hasher(user.password).algorithm,
+                         'pbkdf2_sha256')
+        self.assertRedirects(self.login(), reverse('posts:index'))
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'md5')
+
+    def test_wrong_password_does_not_rehash(self):
+        """Неудачный вход не трогает сохранённый хэш."""
+        with override_settings(PASSWORD_HASHERS=PBKDF2):
+            user = User.objects.create_user(
+                'hasher', password='secret-password')
+        encoded = user.password
+        self.assertEqual(self.login('wrong-password').status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.password, encoded)
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,12 +61,28 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# development — шаблоны перечитываются с диска при каждом рендере;
+# production — кэширующий загрузчик, шаблон разбирается один раз на процесс,
+# а шаблоны проекта компилируются заранее при запуске WSGI (core/templating.py)
+TEMPLATE_LOADERS = {
+    'development': [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ],
+}
+TEMPLATE_LOADERS['production'] = [
+    ('django.template.loaders.cached.Loader',
+     TEMPLATE_LOADERS['development']),
+]
+TEMPLATE_PROFILE = os.getenv(
+    'TEMPLATE_PROFILE', 'development' if DEBUG else 'production')
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS[TEMPLATE_PROFILE],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -83,11 +100,39 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# SQLite по умолчанию; PostgreSQL — DB_ENGINE=django.db.backends.postgresql
+# и параметры подключения в DB_NAME, POSTGRES_USER, POSTGRES_PASSWORD,
+# DB_HOST и DB_PORT. Соединение держится DB_CONN_MAX_AGE секунд.
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', 'yatube'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+        }
     }
+DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+# применяются к каждому соединению с SQLite (core/db.py): WAL разводит
+# чтение и запись, synchronous=NORMAL в WAL не теряет целостность при
+# сбое процесса, busy_timeout — сколько мс ждать чужую запись
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
 }
 
 
@@ -110,6 +155,75 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Профиль хэширования паролей: pbkdf2 (по умолчанию Django), argon2 и
+# bcrypt (argon2-cffi и bcrypt есть в requirements.txt). Остальные хэшеры
+# профиля проверяют старые пароли; при входе пароль пересчитывается первым
+# хэшером профиля. Быстрый MD5 для тестов включают только TEST_RUNNER и
+# tests/conftest.py (core/testing.py).
+PASSWORD_HASHER_PROFILE = os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+DEFAULT_PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'users.hashers.Argon2PasswordHasher',
+    'users.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': DEFAULT_PASSWORD_HASHERS,
+    'argon2': ['users.hashers.Argon2PasswordHasher'] + [
+        hasher for hasher in DEFAULT_PASSWORD_HASHERS if 'Argon2' not in hasher],
+    'bcrypt': ['users.hashers.BCryptSHA256PasswordHasher'] + [
+        hasher for hasher in DEFAULT_PASSWORD_HASHERS if 'BCrypt' not in hasher],
+}
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+TEST_RUNNER = 'core.testing.TestRunner'
+
+
+# Кэши по назначению (см. core/cache.py). local — память процесса,
+# у каждого воркера своя; shared — файлы в CACHE_DIR, общие для всех
+# процессов машины (CACHE_DIR лучше держать в /dev/shm).
+CACHE_BACKENDS = {
+    'local': 'core.cache.LocMemCache',
+    'shared': 'core.cache.MmapCache',
+}
+CACHE_PROFILE = os.getenv('CACHE_PROFILE', 'local')
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+# число записей и размер слота общего кэша под содержимое алиаса
+CACHE_ALIASES = {
+    'default': {'MAX_ENTRIES': 1024, 'SLOT_SIZE': 4 * 1024},
+    'pages': {'MAX_ENTRIES': 1024, 'SLOT_SIZE': 64 * 1024},
+    'fragments': {'MAX_ENTRIES': 4096, 'SLOT_SIZE': 4 * 1024},
+    'counters': {'MAX_ENTRIES': 256, 'SLOT_SIZE': 256},
+    'sessions': {'MAX_ENTRIES': 8192, 'SLOT_SIZE': 2 * 1024},
+}
+CACHES = {
+    alias: {
+        'BACKEND': CACHE_BACKENDS[CACHE_PROFILE],
+        'LOCATION': (os.path.join(CACHE_DIR, f'{alias}.cache')
+                     if CACHE_PROFILE == 'shared' else alias),
+        'OPTIONS': options,
+    }
+    for alias, options in CACHE_ALIASES.items()
+}
+
+
+# Хранилище сессий: db, cached_db (чтение из кэша, запись в БД), cache
+# (только кэш — сессии теряются при его очистке) или signed_cookies
+# (данные в подписанной куке, выход не отзывает её копии). Кэш сессий
+# должен быть общим для воркеров, иначе выход отзывает сессию только в
+# одном из них (core/checks.py), поэтому cached_db — по умолчанию лишь
+# с CACHE_PROFILE=shared.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = os.getenv(
+    'SESSION_PROFILE', 'cached_db' if CACHE_PROFILE == 'shared' else 'db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+SESSION_CACHE_ALIAS = 'sessions'
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -129,14 +243,52 @@ USE_TZ = True
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_URL = '/static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'static_root'))
+# production: collectstatic пишет имена с хэшем, .gz, .br и манифест,
+# а yatube/wsgi.py раздаёт их с кэшированием навсегда (core/staticfiles.py)
+STATICFILES_STORAGES = {
+    'development': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    'production': 'core.staticfiles.CompressedManifestStorage',
+}
+STATIC_PROFILE = os.getenv(
+    'STATIC_PROFILE', 'development' if DEBUG else 'production')
+STATICFILES_STORAGE = STATICFILES_STORAGES[STATIC_PROFILE]
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_URL = '/media/'
+FILE_UPLOAD_PERMISSIONS = 0o644
+POSTS_IMAGE_MAX_SIZE = 10 * 1024 * 1024
 
 POSTS_SHOWN = 10
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# письма уходят в очередь, отправляет их воркер через EMAIL_DELIVERY_BACKEND
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_BATCH_SIZE = 100
+# письмо, отвергнутое сервером столько раз, больше не отправляется
+EMAIL_MAX_ATTEMPTS = 5
 
 COUNT_WORD = 15
 
 POSTS_CHIK = 10
+
+POSTS_COUNTERS_TIMEOUT = 60 * 60
+
+POST_CARDS_TIMEOUT = 60 * 60 * 24
+
+# ширины уменьшенных копий картинок постов для srcset
+POSTS_IMAGE_WIDTHS = (320, 640, 960)
+
+# кэш страниц для анонимных посетителей, 0 — выключен
+POSTS_PAGE_CACHE_TIMEOUT = 0
+
+# с этого числа подписчиков посты автора подмешиваются в ленту при чтении
+POSTS_TIMELINE_FANOUT_LIMIT = 10_000
+
+# True — задачи выполняются сразу при постановке, без воркера
+TASKS_EAGER = False
+# через сколько секунд задача без ответа от воркера возвращается в очередь
+TASKS_LEASE_TIMEOUT = 10 * 60
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# при --preload gunicorn прогретый кэш достаётся воркерам от мастера
+from core.templating import warmup  # noqa: E402
+
+warmup()
+
+# собранная collectstatic статика отдаётся, не доходя до Django
+from core.staticfiles import StaticFilesApplication  # noqa: E402
+
+application = StaticFilesApplication(application)